@@ -1,10 +1,19 @@
 # app/crud.py
-from typing import List, Optional
-from sqlmodel import Session, select
-from app.models import Category, Session as InterviewSession, Answer, User
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Iterator, List, Optional
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import or_, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, func, select
+from app.database import POSTGRES_SEARCH_DOCUMENT
+from app.tracing import traced
+from app.models import Category, CategoryDailyStats, IdempotencyRecord, Session as InterviewSession, Answer, User
 from passlib.hash import bcrypt
 
 
+@traced
 def create_category(session: Session, category: Category) -> Category:
     session.add(category)
     session.commit()
@@ -12,30 +21,67 @@ def create_category(session: Session, category: Category) -> Category:
     return category
 
 
+@traced
 def get_categories(session: Session) -> List[Category]:
     return session.exec(select(Category)).all()
 
 
+@traced
 def get_category_by_name(session: Session, category_name: str) -> Optional[Category]:
     statement = select(Category).where(Category.name == category_name)
     return session.exec(statement).first()
 
 
+@traced
 def get_category_by_id(session: Session, category_id: int) -> Optional[Category]:
     return session.get(Category, category_id)
 
 
+@traced
+def bump_category_stats(session: Session, category_id: int, day: date, **increments: float) -> None:
+    """
+    Adds `increments` to the category's counters for `day` with a single
+    atomic upsert, as part of the caller's transaction.
+    """
+    dialect = session.get_bind().dialect.name
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    table = CategoryDailyStats.__table__
+    statement = insert(table).values(category_id=category_id, day=day, **increments)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.category_id, table.c.day],
+        set_={name: table.c[name] + amount for name, amount in increments.items()},
+    )
+    session.exec(statement)
+
+
+@traced
+def get_category_stats(session: Session, since: date) -> List[Any]:
+    statement = (
+        select(CategoryDailyStats, Category.name)
+        .join(Category, Category.id == CategoryDailyStats.category_id)
+        .where(CategoryDailyStats.day >= since)
+        .order_by(CategoryDailyStats.category_id, CategoryDailyStats.day)
+    )
+    return session.exec(statement).all()
+
+
+@traced
 def create_session(session: Session, session_data: InterviewSession) -> InterviewSession:
     session.add(session_data)
+    bump_category_stats(
+        session, session_data.category_id, session_data.started_at.date(), sessions_started=1
+    )
     session.commit()
     session.refresh(session_data)
     return session_data
 
 
+@traced
 def get_session(session: Session, session_id: int) -> Optional[InterviewSession]:
     return session.get(InterviewSession, session_id)
 
 
+@traced
 def add_answer(session: Session, answer: Answer) -> Answer:
     session.add(answer)
     session.commit()
@@ -43,11 +89,269 @@ def add_answer(session: Session, answer: Answer) -> Answer:
     return answer
 
 
+@traced
 def get_answers(session: Session, session_id: int) -> List[Answer]:
     statement = select(Answer).where(Answer.session_id == session_id)
     return session.exec(statement).all()
 
 
+@traced
+def count_answers(session: Session, session_id: int) -> int:
+    statement = select(func.count()).select_from(Answer).where(Answer.session_id == session_id)
+    return session.exec(statement).one()
+
+
+@traced
+def claim_session_for_answer(
+    session: Session,
+    session_id: int,
+    version: int,
+    lease_seconds: int,
+) -> Optional[int]:
+    """
+    Marks the session's current question as being answered with a
+    compare-and-swap on `version`, and commits (together with anything else
+    pending, such as an idempotency key). Returns the new version, or None when
+    another request changed the session or holds an unexpired claim.
+    """
+    now = datetime.utcnow()
+    statement = (
+        update(InterviewSession)
+        .where(InterviewSession.id == session_id)
+        .where(InterviewSession.version == version)
+        .where(InterviewSession.completed == False)  # noqa: E712
+        .where(or_(
+            InterviewSession.answer_claimed_at == None,  # noqa: E711
+            InterviewSession.answer_claimed_at < now - timedelta(seconds=lease_seconds),
+        ))
+        .values(version=version + 1, answer_claimed_at=now)
+    )
+    if session.exec(statement).rowcount != 1:
+        session.rollback()
+        return None
+    session.commit()
+    return version + 1
+
+
+@traced
+def release_answer_claim(
+    session: Session,
+    session_id: int,
+    claimed_version: int,
+    idempotency_record_id: Optional[int] = None,
+) -> None:
+    """
+    Gives up a claim after a failed attempt so the answer can be resubmitted,
+    forgetting the idempotency key that was reserved for it.
+    """
+    session.rollback()
+    session.exec(
+        update(InterviewSession)
+        .where(InterviewSession.id == session_id)
+        .where(InterviewSession.version == claimed_version)
+        .values(version=claimed_version + 1, answer_claimed_at=None)
+    )
+    if idempotency_record_id is not None:
+        session.exec(delete(IdempotencyRecord).where(IdempotencyRecord.id == idempotency_record_id))
+    session.commit()
+
+
+@traced
+def save_answer_and_advance(
+    session: Session,
+    claimed_version: int,
+    category_id: int,
+    started_at: datetime,
+    answer: Answer,
+    next_question: Optional[str],
+    question_plan: List[str],
+    idempotency_record_id: Optional[int] = None,
+    response_body: Optional[dict] = None,
+) -> bool:
+    """
+    Stores the answer and moves the session to `next_question` (or completes
+    it when there is none) in a single transaction, provided the session is
+    still at `claimed_version`. Returns False, saving nothing, if the claim
+    was lost.
+    """
+    now = datetime.utcnow()
+    advanced = session.exec(
+        update(InterviewSession)
+        .where(InterviewSession.id == answer.session_id)
+        .where(InterviewSession.version == claimed_version)
+        .values(
+            version=claimed_version + 1,
+            answer_claimed_at=None,
+            current_question=next_question,
+            question_plan=question_plan,
+            completed=next_question is None,
+        )
+    )
+    if advanced.rowcount != 1:
+        session.rollback()
+        return False
+
+    # Completions are credited to the day the session started, like the
+    # start itself, so completed / started is a rate over the same sessions.
+    increments = {"answers_submitted": 1}
+    if next_question is None:
+        completion = {
+            "sessions_completed": 1,
+            "completion_seconds": (now - started_at).total_seconds(),
+        }
+        if started_at.date() == now.date():
+            increments.update(completion)
+        else:
+            bump_category_stats(session, category_id, started_at.date(), **completion)
+    bump_category_stats(session, category_id, now.date(), **increments)
+
+    session.add(answer)
+    if idempotency_record_id is not None:
+        session.exec(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.id == idempotency_record_id)
+            .values(response_status=200, response_body=response_body)
+        )
+    session.commit()
+    return True
+
+
+@traced
+def reserve_idempotency_key(
+    session: Session, user_id: int, key: str, request_hash: str, lease_seconds: int
+) -> Optional[int]:
+    """
+    Inserts an in-flight record for the key without committing and returns its
+    id. If the key is taken by the same request whose attempt has been in
+    flight for longer than `lease_seconds` (its worker died), takes the record
+    over with a compare-and-swap on `created_at` instead. Returns None if the
+    user has already used this key otherwise.
+    """
+    record = IdempotencyRecord(user_id=user_id, key=key, request_hash=request_hash)
+    session.add(record)
+    try:
+        session.flush()
+        return record.id
+    except IntegrityError:
+        session.rollback()
+
+    now = datetime.utcnow()
+    return session.exec(
+        update(IdempotencyRecord)
+        .where(IdempotencyRecord.user_id == user_id)
+        .where(IdempotencyRecord.key == key)
+        .where(IdempotencyRecord.request_hash == request_hash)
+        .where(IdempotencyRecord.response_status == None)  # noqa: E711
+        .where(IdempotencyRecord.created_at < now - timedelta(seconds=lease_seconds))
+        .values(created_at=now)
+        .returning(IdempotencyRecord.id)
+    ).scalar_one_or_none()
+
+
+@traced
+def get_idempotency_record(session: Session, user_id: int, key: str) -> Optional[IdempotencyRecord]:
+    statement = select(IdempotencyRecord).where(
+        IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key
+    )
+    return session.exec(statement).first()
+
+
+@traced
+def purge_idempotency_records(session: Session, older_than: timedelta) -> int:
+    """
+    Deletes Idempotency-Key records created more than `older_than` ago and
+    returns how many were removed.
+    """
+    cutoff = datetime.utcnow() - older_than
+    result = session.exec(delete(IdempotencyRecord).where(IdempotencyRecord.created_at < cutoff))
+    session.commit()
+    return result.rowcount
+
+
+HISTORY_COLUMNS = [
+    "session_id", "user_id", "category_id", "completed", "started_at",
+    "answer_id", "question", "answer_text", "feedback", "submitted_at",
+]
+
+
+def iter_history(
+    session: Session,
+    user_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    chunk_size: int = 1000,
+) -> Iterator[Any]:
+    """
+    Streams every session with its answers (one row per answer, or a single row
+    with empty answer fields for a session without answers) through a
+    server-side cursor, holding at most `chunk_size` rows in memory.
+    """
+    statement = (
+        select(
+            InterviewSession.id, InterviewSession.user_id, InterviewSession.category_id,
+            InterviewSession.completed, InterviewSession.started_at,
+            Answer.id, Answer.question, Answer.answer_text, Answer.feedback, Answer.submitted_at,
+        )
+        .outerjoin(Answer, Answer.session_id == InterviewSession.id)
+        .order_by(InterviewSession.id, Answer.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if user_id is not None:
+        statement = statement.where(InterviewSession.user_id == user_id)
+    if category_id is not None:
+        statement = statement.where(InterviewSession.category_id == category_id)
+    yield from session.exec(statement)
+
+
+SQLITE_SEARCH_SQL = text("""
+    SELECT answer.id AS answer_id, answer.session_id, answer.question, answer.answer_text,
+           answer.feedback, answer.submitted_at, -bm25(answer_fts) AS score
+    FROM answer_fts
+    JOIN answer ON answer.id = answer_fts.rowid
+    JOIN session ON session.id = answer.session_id
+    WHERE answer_fts MATCH :query AND (:user_id IS NULL OR session.user_id = :user_id)
+    ORDER BY bm25(answer_fts)
+    LIMIT :limit OFFSET :offset
+""")
+
+POSTGRES_SEARCH_SQL = text(f"""
+    SELECT answer.id AS answer_id, answer.session_id, answer.question, answer.answer_text,
+           answer.feedback, answer.submitted_at, ts_rank_cd({POSTGRES_SEARCH_DOCUMENT}, query) AS score
+    FROM answer
+    JOIN session ON session.id = answer.session_id,
+         websearch_to_tsquery('english', :query) AS query
+    WHERE {POSTGRES_SEARCH_DOCUMENT} @@ query
+      AND (CAST(:user_id AS INTEGER) IS NULL OR session.user_id = :user_id)
+    ORDER BY score DESC, answer.id DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+
+@traced
+def search_answers(
+    session: Session,
+    query: str,
+    user_id: Optional[int],
+    limit: int,
+    offset: int,
+) -> List[Any]:
+    """
+    Ranked full-text search over questions, answers and feedback, restricted to
+    one user's sessions unless `user_id` is None.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        statement, match = POSTGRES_SEARCH_SQL, query
+    else:
+        # Quote every word so user input can never be parsed as FTS5 syntax;
+        # consecutive terms are implicitly ANDed.
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        statement, match = SQLITE_SEARCH_SQL, " ".join(f'"{word}"' for word in words)
+    params = {"query": match, "user_id": user_id, "limit": limit, "offset": offset}
+    return session.execute(statement, params).all()
+
+
+@traced
 def create_user(session: Session, user: User, password: str) -> User:
     user.hashed_password = bcrypt.hash(password)
     session.add(user)
@@ -56,11 +360,13 @@ def create_user(session: Session, user: User, password: str) -> User:
     return user
 
 
+@traced
 def get_user_by_username(session: Session, username: str) -> Optional[User]:
     statement = select(User).where(User.username == username)
     return session.exec(statement).first()
 
 
+@traced
 def authenticate_user(session: Session, username: str, password: str) -> Optional[User]:
     user = get_user_by_username(session, username)
     if not user:
@@ -1,16 +1,215 @@
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi import Request, Response
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlmodel import SQLModel, Session, create_engine
-from app.settings import DATABASE_URL
+from app.settings import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    READ_YOUR_WRITES_SECONDS,
+    REPLICA_CONNECT_TIMEOUT_SECONDS,
+    REPLICA_HEALTH_CHECK_SECONDS,
+)
 
 # Connection string with no modification (sslmode=disable already included in the .env)
 connection_string = str(DATABASE_URL)
 
-engine = create_engine(
-    connection_string, pool_recycle=300
+
+def make_engine(url: str, connect_timeout: Optional[int] = None) -> Engine:
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    elif connect_timeout is not None:
+        connect_args = {"connect_timeout": connect_timeout}
+    else:
+        connect_args = {}
+    return create_engine(url, pool_recycle=300, connect_args=connect_args)
+
+
+engine = make_engine(connection_string)
+
+
+class ReplicaRouter:
+    """
+    Hands out read replica engines round-robin, skipping replicas whose last
+    health check failed. Health is re-checked at most once per interval.
+    """
+
+    def __init__(self, engines: List[Engine], health_check_interval: float) -> None:
+        self.engines = engines
+        self.health_check_interval = health_check_interval
+        self._cycle = itertools.cycle(range(len(engines)))
+        self._healthy: Dict[int, bool] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._probing: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def _probe(self, index: int) -> bool:
+        # Runs without the lock held, so a slow or unreachable replica only
+        # delays the one request that happens to re-check it.
+        try:
+            with self.engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+            healthy = True
+        except Exception:
+            healthy = False
+        with self._lock:
+            self._healthy[index] = healthy
+            self._checked_at[index] = time.monotonic()
+            self._probing.discard(index)
+        return healthy
+
+    def mark_unhealthy(self, replica: Engine) -> None:
+        index = self.engines.index(replica)
+        with self._lock:
+            self._healthy[index] = False
+            self._checked_at[index] = time.monotonic()
+
+    def pick(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = next(self._cycle)
+                checked_at = self._checked_at.get(index, float("-inf"))
+                stale = time.monotonic() - checked_at >= self.health_check_interval
+                # Only one request re-checks a replica; the others go by its
+                # last known state (unknown counts as unhealthy).
+                probe = stale and index not in self._probing
+                if probe:
+                    self._probing.add(index)
+                healthy = self._healthy.get(index, False)
+            if probe:
+                healthy = self._probe(index)
+            if healthy:
+                return self.engines[index]
+        return None
+
+
+replica_router = ReplicaRouter(
+    [make_engine(url, connect_timeout=REPLICA_CONNECT_TIMEOUT_SECONDS) for url in DATABASE_REPLICA_URLS],
+    health_check_interval=REPLICA_HEALTH_CHECK_SECONDS,
+)
+
+# Set on responses to writes that the client will immediately read back, so
+# its next reads go to the primary until the replicas have caught up.
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def mark_recent_write(response: Response) -> None:
+    until = int(time.time()) + READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        key=READ_PRIMARY_COOKIE,
+        value=str(until),
+        httponly=True,
+        samesite="lax",
+        max_age=READ_YOUR_WRITES_SECONDS,
+    )
+
+
+def _requires_primary(request: Request) -> bool:
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    return until is not None and until.isdigit() and int(until) > time.time()
+
+
+# Full-text index over answers. On SQLite an external-content FTS5 table is
+# kept in sync by triggers; on Postgres an expression GIN index over the
+# document below is built by `python -m app.migrations` (see app/migrations.py).
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS answer_fts USING fts5(
+        question, answer_text, feedback,
+        content='answer', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS answer_fts_ai AFTER INSERT ON answer BEGIN
+        INSERT INTO answer_fts(rowid, question, answer_text, feedback)
+        VALUES (new.id, new.question, new.answer_text, new.feedback);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS answer_fts_ad AFTER DELETE ON answer BEGIN
+        INSERT INTO answer_fts(answer_fts, rowid, question, answer_text, feedback)
+        VALUES ('delete', old.id, old.question, old.answer_text, old.feedback);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS answer_fts_au AFTER UPDATE ON answer BEGIN
+        INSERT INTO answer_fts(answer_fts, rowid, question, answer_text, feedback)
+        VALUES ('delete', old.id, old.question, old.answer_text, old.feedback);
+        INSERT INTO answer_fts(rowid, question, answer_text, feedback)
+        VALUES (new.id, new.question, new.answer_text, new.feedback);
+    END""",
+]
+
+# Searches must use this exact expression for Postgres to pick the index
+POSTGRES_SEARCH_DOCUMENT = (
+    "to_tsvector('english', coalesce(question, '') || ' ' || "
+    "coalesce(answer_text, '') || ' ' || coalesce(feedback, ''))"
 )
 
+
+def create_search_index(bind: Engine) -> None:
+    """
+    Creates the SQLite full-text index over answers if it does not exist yet,
+    indexing any rows already present. Safe to run on every startup; the
+    Postgres index is built by the one-off migration instead.
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as connection:
+        existed = inspect(connection).has_table("answer_fts")
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if not existed:
+            connection.execute(text("INSERT INTO answer_fts(answer_fts) VALUES ('rebuild')"))
+
+
+# Columns added to tables that already existed in earlier releases, as
+# (table, column, constraints). create_all() never alters an existing table,
+# so startup adds whichever are missing. Each one is nullable or has a
+# constant default, which both SQLite and Postgres add without rewriting the
+# table; the column type comes from the model.
+ADDED_COLUMNS: List[Tuple[str, str, str]] = [
+    ("session", "question_plan", ""),
+    ("session", "version", "NOT NULL DEFAULT 0"),
+    ("session", "answer_claimed_at", ""),
+]
+
+
+def add_missing_columns(bind: Engine) -> None:
+    preparer = bind.dialect.identifier_preparer
+    # Several workers may start at once; Postgres can skip a column another
+    # worker just added.
+    if_not_exists = " IF NOT EXISTS" if bind.dialect.name == "postgresql" else ""
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        for table, column, constraints in ADDED_COLUMNS:
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column in existing:
+                continue
+            column_type = SQLModel.metadata.tables[table].c[column].type.compile(dialect=bind.dialect)
+            connection.execute(text(
+                f"ALTER TABLE {preparer.quote(table)} ADD COLUMN{if_not_exists} "
+                f"{preparer.quote(column)} {column_type} {constraints}".rstrip()
+            ))
+
+
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    add_missing_columns(engine)
+    create_search_index(engine)
     
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+def get_read_session(request: Request):
+    """
+    Session for read-only routes: a healthy replica when one is configured,
+    otherwise (or right after this client wrote) the primary.
+    """
+    replica = None if _requires_primary(request) else replica_router.pick()
+    with Session(replica or engine) as session:
+        try:
+            yield session
+        except OperationalError:
+            if replica is not None:
+                replica_router.mark_unhealthy(replica)
+            raise
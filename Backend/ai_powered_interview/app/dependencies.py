@@ -4,7 +4,7 @@ from jose import JWTError, jwt
 from sqlmodel import Session
 from datetime import datetime, timedelta
 from typing import Optional
-from app.database import get_session
+from app.database import get_read_session
 from app import crud, models, schemas
 from app.settings import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
 
@@ -22,7 +22,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(request: Request, session: Session = Depends(get_session)) -> models.User:
+async def get_current_user(request: Request, session: Session = Depends(get_read_session)) -> models.User:
     """
     Retrieves the current user based on the JWT token stored in the HTTP-only cookie.
     """
@@ -57,3 +57,14 @@ async def get_current_user(request: Request, session: Session = Depends(get_sess
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user
+
+async def get_current_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+    """
+    Retrieves the current user and ensures they have the admin role.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required.",
+        )
+    return current_user
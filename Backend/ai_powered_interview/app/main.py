@@ -1,9 +1,23 @@
 # app/main.py
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import create_db_and_tables
+from app.middleware import RequestSizeLimitMiddleware
+from app.settings import LOG_LEVEL, MAX_REQUEST_BODY_BYTES
+from app.tracing import TracedJSONResponse, TracingMiddleware
 from contextlib import asynccontextmanager
-from app.routers import categories, session, users
+from app.routers import admin, categories, export, search, session, users
+
+# uvicorn only configures its own loggers; without a handler here the app's
+# INFO records (e.g. per-call LLM prompt tokens and latency) would be dropped.
+app_logger = logging.getLogger("app")
+app_logger.setLevel(LOG_LEVEL)
+if not app_logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    app_logger.addHandler(handler)
+    app_logger.propagate = False
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -17,8 +31,13 @@ app = FastAPI(
     lifespan=lifespan,
     title="Interview Management Microservice",
     version="1.0.0",
+    default_response_class=TracedJSONResponse,
 )
 
+# Reject pathological request bodies before they are parsed. Added before
+# CORS so that CORS wraps it and the 413 still carries CORS headers.
+app.add_middleware(RequestSizeLimitMiddleware, max_body_bytes=MAX_REQUEST_BODY_BYTES)
+
 # CORS Configuration
 origins = [
     "http://localhost:3000",  # Frontend URL
@@ -34,10 +53,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the request span covers every other middleware
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(users.router)
 app.include_router(categories.router)
 app.include_router(session.router)
+app.include_router(export.router)
+app.include_router(admin.router)
+app.include_router(search.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,137 @@
+# app/migrations.py
+"""
+Schema changes and data backfills that are too slow, or lock too much, to run
+on every startup. Run once per deploy, alongside the new release:
+
+    python -m app.migrations
+
+Every step is idempotent, so running it again (or after an interrupted run)
+is safe.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Tuple, Union
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from app.database import POSTGRES_SEARCH_DOCUMENT
+from app.models import Answer, CategoryDailyStats, Session as InterviewSession
+
+# (name, table and indexed columns or expressions)
+INDEXES: List[Tuple[str, str]] = [
+    # Declared on Answer.session_id, but create_all() only adds it to new tables
+    ("ix_answer_session_id", "answer (session_id)"),
+    # Lets the archive job purge expired Idempotency-Key records by age
+    ("ix_idempotencyrecord_created_at", "idempotencyrecord (created_at)"),
+]
+
+POSTGRES_INDEXES: List[Tuple[str, str]] = [
+    ("ix_answer_search", f"answer USING GIN (({POSTGRES_SEARCH_DOCUMENT}))"),
+]
+
+
+def create_indexes(bind: Engine) -> None:
+    """
+    Builds missing indexes. On Postgres they are built CONCURRENTLY, which
+    lets writes to the table continue while the index is built.
+    """
+    if bind.dialect.name != "postgresql":
+        with bind.begin() as connection:
+            for name, definition in INDEXES:
+                connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for name, definition in INDEXES + POSTGRES_INDEXES:
+            # An interrupted concurrent build leaves an invalid index behind
+            # that IF NOT EXISTS would keep forever; drop it and start over.
+            invalid = connection.execute(text(
+                "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+                "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+            ), {"name": name}).first()
+            if invalid:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            connection.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"))
+
+
+def _day(value: Union[date, datetime, str]) -> date:
+    # func.date() returns a string on SQLite and a date on Postgres
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value if not isinstance(value, datetime) else value.date()
+
+
+def backfill_category_stats(bind: Engine, batch_size: int = 1000) -> int:
+    """
+    Rebuilds the CategoryDailyStats counters of every (category, day) that
+    has sessions or answers in the database, from those rows, so days from
+    before the rollups existed are reported in full. Counters are overwritten,
+    not added to, which makes re-running it harmless; rows whose sessions have
+    all been archived are left as they are. Returns the number of rows written.
+    """
+    stats: Dict[Tuple[int, date], Dict[str, float]] = defaultdict(lambda: {
+        "sessions_started": 0,
+        "sessions_completed": 0,
+        "completion_seconds": 0.0,
+        "answers_submitted": 0,
+    })
+    last_answer = (
+        select(Answer.session_id, func.max(Answer.submitted_at).label("finished_at"))
+        .group_by(Answer.session_id)
+        .subquery()
+    )
+    with bind.connect() as connection:
+        sessions = connection.execution_options(yield_per=batch_size).execute(
+            select(
+                InterviewSession.category_id,
+                InterviewSession.started_at,
+                InterviewSession.completed,
+                last_answer.c.finished_at,
+            ).outerjoin(last_answer, last_answer.c.session_id == InterviewSession.id)
+        )
+        for category_id, started_at, completed, finished_at in sessions:
+            # Like the live counters, completions belong to the start day
+            row = stats[(category_id, started_at.date())]
+            row["sessions_started"] += 1
+            if completed and finished_at is not None:
+                row["sessions_completed"] += 1
+                row["completion_seconds"] += (finished_at - started_at).total_seconds()
+
+        answers = connection.execute(
+            select(
+                InterviewSession.category_id,
+                func.date(Answer.submitted_at),
+                func.count(),
+            )
+            .join(InterviewSession, InterviewSession.id == Answer.session_id)
+            .group_by(InterviewSession.category_id, func.date(Answer.submitted_at))
+        )
+        for category_id, day, count in answers:
+            stats[(category_id, _day(day))]["answers_submitted"] = count
+
+    if not stats:
+        return 0
+    insert = postgresql_insert if bind.dialect.name == "postgresql" else sqlite_insert
+    table = CategoryDailyStats.__table__
+    rows = [{"category_id": c, "day": d, **counters} for (c, d), counters in stats.items()]
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.category_id, table.c.day],
+        set_={name: statement.excluded[name] for name in rows[0] if name not in ("category_id", "day")},
+    )
+    with bind.begin() as connection:
+        for start in range(0, len(rows), batch_size):
+            connection.execute(statement, rows[start:start + batch_size])
+    return len(rows)
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    create_indexes(engine)
+    print("Indexes are up to date")
+    print(f"Backfilled {backfill_category_stats(engine)} category daily stats rows")
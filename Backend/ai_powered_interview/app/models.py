@@ -1,6 +1,7 @@
 # app/models.py
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
+from sqlalchemy import JSON, Column, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 from passlib.hash import bcrypt
 
@@ -31,8 +32,14 @@ class Session(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id")
     category_id: int = Field(foreign_key="category.id")
     current_question: Optional[str] = None
+    # Questions still to be asked after current_question, in order
+    question_plan: List[str] = Field(default_factory=list, sa_column=Column(JSON))
     completed: bool = Field(default=False)
     started_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped by every compare-and-swap update of the session's progress
+    version: int = Field(default=0)
+    # Set while an answer to current_question is being processed
+    answer_claimed_at: Optional[datetime] = None
 
     user: Optional[User] = Relationship(back_populates="sessions")
     category: Optional[Category] = Relationship(back_populates="sessions")
@@ -41,10 +48,41 @@ class Session(SQLModel, table=True):
 
 class Answer(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    session_id: int = Field(foreign_key="session.id")
+    session_id: int = Field(foreign_key="session.id", index=True)
     question: str
     answer_text: str
     feedback: str
     submitted_at: datetime = Field(default_factory=datetime.utcnow)
 
     session: Optional[Session] = Relationship(back_populates="answers")
+
+
+class CategoryDailyStats(SQLModel, table=True):
+    """
+    Per-category, per-day counters maintained incrementally by the write paths
+    so analytics never have to scan Session or Answer.
+    """
+    category_id: int = Field(foreign_key="category.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    sessions_started: int = Field(default=0)
+    # Completions and their durations count towards the day the session started
+    sessions_completed: int = Field(default=0)
+    completion_seconds: float = Field(default=0)
+    answers_submitted: int = Field(default=0)
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    """
+    Remembers the outcome of a request sent with an Idempotency-Key so retries
+    replay it instead of running it again. A record without a response status
+    belongs to a request that is still in flight.
+    """
+    __table_args__ = (UniqueConstraint("user_id", "key"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    key: str = Field(max_length=255)
+    request_hash: str
+    response_status: Optional[int] = None
+    response_body: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,78 @@
+# app/routers/admin.py
+from datetime import datetime, timedelta
+from typing import Dict, List
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from app import crud, models, schemas
+from app.database import get_read_session
+from app.dependencies import get_current_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/analytics/categories", response_model=List[schemas.CategoryStatsRead])
+def read_category_analytics(
+    days: int = Query(30, ge=1, le=366, description="Number of days to include"),
+    session: Session = Depends(get_read_session),
+    current_user: models.User = Depends(get_current_admin)  # Admins only
+):
+    """
+    Retrieves per-category interview statistics for the last `days` days.
+
+    **Endpoint:** GET /admin/analytics/categories?days=30
+
+    **Request Headers:**
+    - Cookie: access_token=<JWT token> (admin user)
+
+    **Response:**
+    [
+      {
+        "category_id": 1,
+        "category_name": "Software Engineering",
+        "sessions_started": 40,
+        "sessions_completed": 31,
+        "completion_rate": 0.775,
+        "average_completion_seconds": 912.4,
+        "answers_per_day": [{"day": "2024-10-24", "answers": 57}]
+      }
+    ]
+
+    Served from the incrementally maintained daily rollups, so the cost
+    depends on categories x days rather than on the number of sessions.
+    `sessions_completed` counts sessions started in the window that have been
+    completed, whenever that happened, so `completion_rate` never exceeds 1.
+
+    **Error Responses:**
+    - 401 Unauthorized: Missing or invalid JWT token.
+    - 403 Forbidden: The user is not an admin.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    stats: Dict[int, schemas.CategoryStatsRead] = {}
+    completion_seconds: Dict[int, float] = {}
+    for row, category_name in crud.get_category_stats(session, since):
+        item = stats.get(row.category_id)
+        if item is None:
+            item = stats[row.category_id] = schemas.CategoryStatsRead(
+                category_id=row.category_id,
+                category_name=category_name,
+                sessions_started=0,
+                sessions_completed=0,
+                completion_rate=0.0,
+                average_completion_seconds=None,
+                answers_per_day=[],
+            )
+            completion_seconds[row.category_id] = 0.0
+        item.sessions_started += row.sessions_started
+        item.sessions_completed += row.sessions_completed
+        completion_seconds[row.category_id] += row.completion_seconds
+        if row.answers_submitted:
+            item.answers_per_day.append(
+                schemas.DailyAnswerCount(day=row.day, answers=row.answers_submitted)
+            )
+
+    for category_id, item in stats.items():
+        if item.sessions_started:
+            item.completion_rate = item.sessions_completed / item.sessions_started
+        if item.sessions_completed:
+            item.average_completion_seconds = completion_seconds[category_id] / item.sessions_completed
+    return list(stats.values())
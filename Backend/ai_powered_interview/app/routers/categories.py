@@ -1,9 +1,9 @@
 # app/routers/categories.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from sqlmodel import Session
 from app import crud, models, schemas
-from app.database import get_session
+from app.database import get_read_session, get_session, mark_recent_write
 from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
@@ -12,6 +12,7 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
 @router.post("/", response_model=schemas.CategoryRead)
 def create_new_category(
     category: schemas.CategoryCreate,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: models.User = Depends(get_current_user)  # Enforce authentication
 ):
@@ -47,12 +48,14 @@ def create_new_category(
         raise HTTPException(status_code=400, detail="Category already exists.")
 
     db_category = models.Category(name=category.name)
-    return crud.create_category(session, db_category)
+    db_category = crud.create_category(session, db_category)
+    mark_recent_write(response)  # The category list is usually re-read right away
+    return db_category
 
 
 @router.get("/", response_model=List[schemas.CategoryRead])
 def read_categories(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_user)  # Enforce authentication
 ):
     """
@@ -0,0 +1,101 @@
+# app/routers/export.py
+import csv
+import io
+import json
+from enum import Enum
+from typing import Any, Iterator, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app import crud, models
+from app.database import get_read_session
+from app.dependencies import get_current_user
+from app.settings import EXPORT_CHUNK_ROWS
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def _cell(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _stream_history(
+    bind: Any,
+    export_format: ExportFormat,
+    user_id: Optional[int],
+    category_id: Optional[int],
+) -> Iterator[bytes]:
+    # The request's session is closed once the route returns, so the stream
+    # opens its own on the same engine for as long as the client keeps reading.
+    with Session(bind) as db:
+        rows = crud.iter_history(db, user_id=user_id, category_id=category_id, chunk_size=EXPORT_CHUNK_ROWS)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.csv:
+            writer.writerow(crud.HISTORY_COLUMNS)
+        pending = 0
+        for row in rows:
+            values = [_cell(value) for value in row]
+            if export_format == ExportFormat.csv:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(crud.HISTORY_COLUMNS, values))))
+                buffer.write("\n")
+            pending += 1
+            if pending >= EXPORT_CHUNK_ROWS:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+@router.get("/history")
+def export_history(
+    format: ExportFormat = ExportFormat.ndjson,
+    user_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_read_session),
+    current_user: models.User = Depends(get_current_user)  # Enforce authentication
+):
+    """
+    Streams a user's full interview history, or every user's history in one
+    category, as NDJSON or CSV with one row per answer.
+
+    **Endpoint:** GET /export/history?format=ndjson|csv&user_id=<id>&category_id=<id>
+
+    **Request Headers:**
+    - Cookie: access_token=<JWT token>
+
+    **Response (NDJSON, chunked):**
+    {"session_id": 1, "user_id": 1, "category_id": 1, "completed": true, "started_at": "...",
+     "answer_id": 1, "question": "...", "answer_text": "...", "feedback": "...", "submitted_at": "..."}
+
+    Regular users can only export their own history. Admins can export any
+    user (`user_id`) or a whole category (`category_id`). Sessions that have
+    been moved to cold storage are not included.
+
+    **Error Responses:**
+    - 400 Bad Request: Admin export without a user_id or category_id filter.
+    - 403 Forbidden: Exporting another user's history without admin rights.
+    - 401 Unauthorized: Missing or invalid JWT token.
+    """
+    if current_user.role != "admin":
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to export this history.")
+        user_id = current_user.id
+    elif user_id is None and category_id is None:
+        raise HTTPException(status_code=400, detail="Provide a user_id or category_id to export.")
+
+    media_type = "application/x-ndjson" if format == ExportFormat.ndjson else "text/csv"
+    return StreamingResponse(
+        _stream_history(db.get_bind(), format, user_id, category_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="history.{format.value}"'},
+    )
@@ -0,0 +1,61 @@
+# app/routers/search.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from app import crud, models, schemas
+from app.database import get_read_session
+from app.dependencies import get_current_user
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/", response_model=schemas.SearchResults)
+def search_history(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    all_users: bool = Query(False, description="Search every user's sessions (admins only)"),
+    session: Session = Depends(get_read_session),
+    current_user: models.User = Depends(get_current_user)  # Enforce authentication
+):
+    """
+    Full-text search over past questions, answers and feedback, best matches first.
+
+    **Endpoint:** GET /search/?q=time complexity&limit=20&offset=0
+
+    **Request Headers:**
+    - Cookie: access_token=<JWT token>
+
+    **Response:**
+    {
+      "results": [
+        {
+          "answer_id": 12,
+          "session_id": 3,
+          "question": "How would you find duplicates in a large array?",
+          "answer_text": "Sort it first, then compare neighbours.",
+          "feedback": "Good start. Mention the time complexity of sorting.",
+          "submitted_at": "2024-10-24T12:55:03.789012",
+          "score": 4.2
+        }
+      ],
+      "limit": 20,
+      "offset": 0
+    }
+
+    Only the current user's sessions are searched unless an admin passes
+    `all_users=true`. Sessions moved to cold storage are not searchable.
+
+    **Error Responses:**
+    - 401 Unauthorized: Missing or invalid JWT token.
+    - 403 Forbidden: all_users requested by a non-admin.
+    """
+    if all_users and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin privileges required.")
+
+    user_id = None if all_users else current_user.id
+    rows = crud.search_answers(session, q, user_id=user_id, limit=limit, offset=offset)
+    return schemas.SearchResults(
+        results=[schemas.SearchHit(**row._mapping) for row in rows],
+        limit=limit,
+        offset=offset,
+    )
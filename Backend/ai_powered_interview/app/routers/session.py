@@ -1,10 +1,15 @@
 # app/routers/session.py
-from fastapi import APIRouter, Depends, HTTPException, Header
+import hashlib
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.responses import JSONResponse
 from typing import Optional, List, Union
 from sqlmodel import Session
 from app import crud, models, schemas
-from app.database import get_session
-from app.services.langchain import generate_question, generate_feedback
+from app.database import get_read_session, get_session, mark_recent_write
+from app.services.archive import cold_store
+from app.services.langchain import generate_question, generate_question_plan, generate_feedback
+from app.settings import ANSWER_CLAIM_LEASE_SECONDS, QUESTIONS_PER_SESSION
 from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/session", tags=["Session"])
@@ -59,17 +64,18 @@ async def initialize_session(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found.")
 
-    # Generate first question using the updated generate_question function
+    # Plan every question of the session with a single LLM call
     try:
-        question = await generate_question(category.id)
+        plan = await generate_question_plan(category.name, QUESTIONS_PER_SESSION)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to generate question.") from e
 
-    # Create session with first question
+    # Create session with the first question and queue the rest
     interview_session = models.Session(
         user_id=user_id,
         category_id=category.id,
-        current_question=question
+        current_question=plan.questions[0],
+        question_plan=plan.questions[1:]
     )
     interview_session = crud.create_session(db, interview_session)
     return interview_session
@@ -78,6 +84,7 @@ async def initialize_session(
 @router.post("/answer", response_model=schemas.ResponseModel)
 async def submit_answer(
     answer_create: schemas.AnswerCreate,
+    response: Response,
     db: Session = Depends(get_session),
     session_id: Optional[int] = Header(None, description="Session ID"),
     category_id: Optional[int] = Header(
@@ -85,6 +92,12 @@ async def submit_answer(
         alias="X-Category-ID",
         description="Category ID"
     ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-chosen key; retries with the same key replay the first response"
+    ),
     current_user: models.User = Depends(get_current_user)  # Get the authenticated user
 ):
     """
@@ -96,6 +109,7 @@ async def submit_answer(
     - Cookie: access_token=<JWT token>
     - Session-ID: <session_id>
     - X-Category-ID: <category_id>
+    - Idempotency-Key: <unique key per answer> (optional)
 
     **Request Body:**
     {
@@ -117,7 +131,10 @@ async def submit_answer(
     - 400 Bad Request: Missing headers or session already completed.
     - 403 Forbidden: Accessing a session that doesn't belong to the user.
     - 404 Not Found: Session or category not found.
+    - 409 Conflict: Another submission for this question (or with this Idempotency-Key) is in progress.
+    - 422 Unprocessable Entity: Idempotency-Key reused for a different request.
     - 500 Internal Server Error: Failed to generate feedback.
+    - 503 Service Unavailable: Feedback model unavailable; the answer was not saved.
     """
     # Validate headers
     if session_id is None:
@@ -126,6 +143,26 @@ async def submit_answer(
     if category_id is None:
         raise HTTPException(status_code=400, detail="X-Category-ID header is required.")
 
+    # Reserve the Idempotency-Key first: a retry of a request that already
+    # succeeded must replay its response even though the session has moved on.
+    idempotency_record_id = None
+    if idempotency_key is not None:
+        request_hash = hashlib.sha256(
+            f"{session_id}:{category_id}:{answer_create.answer_text}".encode()
+        ).hexdigest()
+        idempotency_record_id = crud.reserve_idempotency_key(
+            db, current_user.id, idempotency_key, request_hash, ANSWER_CLAIM_LEASE_SECONDS
+        )
+        if idempotency_record_id is None:
+            record = crud.get_idempotency_record(db, current_user.id, idempotency_key)
+            if record is None:
+                # The other attempt failed and released the key in the meantime
+                idempotency_record_id = crud.reserve_idempotency_key(
+                    db, current_user.id, idempotency_key, request_hash, ANSWER_CLAIM_LEASE_SECONDS
+                )
+            if idempotency_record_id is None:
+                return _replay(record, request_hash)
+
     # Retrieve session
     interview_session = crud.get_session(db, session_id)
     if not interview_session:
@@ -148,75 +185,151 @@ async def submit_answer(
     if not interview_session.current_question:
         raise HTTPException(status_code=400, detail="No current question to answer.")
 
+    # Committing the claim expires the ORM object, so keep what is needed
+    current_question = interview_session.current_question
+    question_plan = list(interview_session.question_plan or [])
+    started_at = interview_session.started_at
+
+    # Claim the current question; concurrent submissions for it lose here,
+    # before any LLM call is made.
+    claimed_version = crud.claim_session_for_answer(
+        db, session_id, interview_session.version, ANSWER_CLAIM_LEASE_SECONDS
+    )
+    if claimed_version is None:
+        raise HTTPException(
+            status_code=409,
+            detail="An answer for this question is already being processed."
+        )
+
+    try:
+        return await _answer_claimed_question(
+            db, response, answer_create, session_id, category_id, claimed_version,
+            current_question, question_plan, started_at, idempotency_record_id,
+        )
+    except Exception:
+        crud.release_answer_claim(db, session_id, claimed_version, idempotency_record_id)
+        raise
+
+
+def _replay(record: Optional[models.IdempotencyRecord], request_hash: str) -> JSONResponse:
+    if record is not None and record.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request."
+        )
+    # Still in flight within its lease (or released and taken again by yet
+    # another attempt)
+    if record is None or record.response_status is None:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed."
+        )
+    replay = JSONResponse(
+        status_code=record.response_status,
+        content=record.response_body,
+        headers={"Idempotent-Replayed": "true"},
+    )
+    if "next_question" not in record.response_body:
+        # A replayed completion is followed by /session/final just like the
+        # original one, so it needs the same read-your-writes guard
+        mark_recent_write(replay)
+    return replay
+
+
+async def _answer_claimed_question(
+    db: Session,
+    response: Response,
+    answer_create: schemas.AnswerCreate,
+    session_id: int,
+    category_id: int,
+    claimed_version: int,
+    current_question: str,
+    question_plan: List[str],
+    started_at: datetime,
+    idempotency_record_id: Optional[int],
+) -> schemas.ResponseModel:
     # Generate feedback for the current answer
     try:
-        feedback = await generate_feedback(interview_session.current_question, answer_create.answer_text)
+        feedback = await generate_feedback(current_question, answer_create.answer_text)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to generate feedback.") from e
 
+    # Never persist the stand-in text as if it were real feedback
+    if feedback.fallback:
+        raise HTTPException(
+            status_code=503,
+            detail="Feedback service is temporarily unavailable. Please resubmit your answer."
+        )
+
     # Ensure feedback is generated
-    if feedback is None or feedback.strip() == "":
+    if feedback.text.strip() == "":
         raise HTTPException(status_code=500, detail="Failed to generate feedback for the answer.")
 
-    # Save the submitted answer with feedback
     answer = models.Answer(
-        session_id=interview_session.id,
-        question=interview_session.current_question,
+        session_id=session_id,
+        question=current_question,
         answer_text=answer_create.answer_text,
-        feedback=feedback
+        feedback=feedback.text
     )
-    crud.add_answer(db, answer)
-
-    # Check the total number of answers submitted so far
-    answers = crud.get_answers(db, interview_session.id)
-    answers_count = len(answers)  # Assuming `get_answers` includes the latest answer
 
-    max_questions = 5
-    if answers_count >= max_questions:
-        interview_session.completed = True
-        interview_session.current_question = None
-        db.add(interview_session)
-        db.commit()
-        db.refresh(interview_session)
+    # Total number of answers including this one
+    answers_count = crud.count_answers(db, session_id) + 1
 
-    
-
-    
-        return schemas.CompletionResponse(
+    if answers_count >= QUESTIONS_PER_SESSION:
+        next_question = None
+        result: schemas.ResponseModel = schemas.CompletionResponse(
             message="Session completed",
-        
+        )
+    else:
+        if question_plan:
+            # Next question comes from the plan made at /session/init, no LLM call
+            next_question, *question_plan = question_plan
+        else:
+            # Sessions started without a (complete) plan generate questions one by one
+            category = crud.get_category_by_id(db, category_id)
+            if not category:
+                raise HTTPException(status_code=404, detail="Category not found.")
+
+            try:
+                next_question = (await generate_question(category.name)).text
+            except Exception as e:
+                raise HTTPException(status_code=500, detail="Failed to generate next question.") from e
+
+        # Return the next question
+        result = schemas.NextQuestionResponse(
+            next_question=next_question
         )
 
-    # Generate the next question
-    category = crud.get_category_by_id(db, interview_session.category_id)
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found.")
-
-    try:
-        next_question = await generate_question(category.id)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to generate next question.") from e
-
-    # Update the session with the new question
-    interview_session.current_question = next_question
-    db.add(interview_session)
-    db.commit()
-    db.refresh(interview_session)
-
-    # Return feedback and the next question
-    return schemas.NextQuestionResponse(
-        next_question=next_question
+    # Save the submitted answer with feedback and move on, unless the claim was lost
+    saved = crud.save_answer_and_advance(
+        db, claimed_version, category_id, started_at, answer,
+        next_question=next_question,
+        question_plan=question_plan,
+        idempotency_record_id=idempotency_record_id,
+        response_body=result.model_dump(),
     )
+    if not saved:
+        raise HTTPException(
+            status_code=409,
+            detail="The session changed while this answer was being processed."
+        )
+
+    if next_question is None:
+        # The final feedback is fetched right after completion; read it from
+        # the primary so replica lag cannot hide the last answer.
+        mark_recent_write(response)
+    return result
 
 
 @router.get("/final", response_model=List[schemas.FinalFeedbackItem])
 def get_final_feedback(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     session_id: Optional[int] = Header(None, description="Session ID"),
     current_user: models.User = Depends(get_current_user)  # Get the authenticated user
 ):
     """
-    Retrieves the final feedback for a completed session.
+    Retrieves the final feedback for a completed session. Sessions that have
+    been moved to cold storage are served from the archive.
 
     **Endpoint:** GET /session/final
 
@@ -245,7 +358,19 @@ def get_final_feedback(
 
     interview_session = crud.get_session(db, session_id)
     if not interview_session:
-        raise HTTPException(status_code=404, detail="Session not found.")
+        archived = cold_store.get(session_id) if cold_store is not None else None
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Session not found.")
+        if archived["user_id"] != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to access this session.")
+        return [
+            schemas.FinalFeedbackItem(
+                question=answer["question"],
+                answer=answer["answer_text"],
+                feedback=answer["feedback"]
+            )
+            for answer in archived["answers"]
+        ]
 
     # Ensure the session belongs to the current user
     if interview_session.user_id != current_user.id:
@@ -4,7 +4,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 from app import crud, models, schemas
 from app.dependencies import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user
-from app.database import get_session
+from app.database import get_session, mark_recent_write
 from datetime import timedelta
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.post("/register", response_model=schemas.UserRead)
-def register_user(user_create: schemas.UserCreate, session: Session = Depends(get_session)):
+def register_user(user_create: schemas.UserCreate, response: Response, session: Session = Depends(get_session)):
     """
     Registers a new user.
 
@@ -29,6 +29,7 @@ def register_user(user_create: schemas.UserCreate, session: Session = Depends(ge
     except IntegrityError:
         session.rollback()
         raise HTTPException(status_code=400, detail="Username or email already exists.")
+    mark_recent_write(response)  # Authenticated lookups must find the new user
     return user
 
 
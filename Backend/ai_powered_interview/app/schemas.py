@@ -1,8 +1,9 @@
 # app/schemas.py
 from typing import List, Optional, Union
-from datetime import datetime
-from sqlmodel import SQLModel
+from datetime import date, datetime
+from sqlmodel import SQLModel, Field
 from pydantic import BaseModel, EmailStr
+from app.settings import MAX_ANSWER_CHARS
 
 
 class CategoryCreate(SQLModel):
@@ -28,7 +29,7 @@ class SessionRead(SQLModel):
 
 
 class AnswerCreate(SQLModel):
-    answer_text: str  # Only answer_text is required
+    answer_text: str = Field(max_length=MAX_ANSWER_CHARS)  # Only answer_text is required
 
 
 class AnswerRead(SQLModel):
@@ -71,6 +72,37 @@ class UserRead(SQLModel):
     created_at: datetime
 
 
+class DailyAnswerCount(BaseModel):
+    day: date
+    answers: int
+
+
+class CategoryStatsRead(BaseModel):
+    category_id: int
+    category_name: str
+    sessions_started: int
+    sessions_completed: int
+    completion_rate: float
+    average_completion_seconds: Optional[float]
+    answers_per_day: List[DailyAnswerCount]
+
+
+class SearchHit(BaseModel):
+    answer_id: int
+    session_id: int
+    question: str
+    answer_text: str
+    feedback: str
+    submitted_at: datetime
+    score: float
+
+
+class SearchResults(BaseModel):
+    results: List[SearchHit]
+    limit: int
+    offset: int
+
+
 # Token Schemas
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,199 @@
+# app/services/archive.py
+"""
+Moves old completed sessions out of the database into an append-only archive,
+and purges Idempotency-Key records past IDEMPOTENCY_KEY_TTL_SECONDS. Meant to
+run periodically (e.g. daily from cron):
+
+    ARCHIVE_DIR=/mnt/interview-archive python -m app.services.archive
+
+Archived rows are deleted from the database, so ARCHIVE_DIR must point at
+persistent storage that every app instance mounts (a shared volume or network
+file system). On a container's own filesystem the archive is lost on the next
+deploy, and instances that cannot see it answer 404 for archived sessions.
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from sqlmodel import Session, col, delete, select
+from app import crud
+from app.models import Answer, Session as InterviewSession
+from app.settings import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_DIR,
+    ARCHIVE_SEGMENT_MAX_BYTES,
+    IDEMPOTENCY_KEY_TTL_SECONDS,
+)
+
+INDEX_FILE = "index.ndjson"
+SEGMENT_PATTERN = "segment-{:06d}.ndjson.gz"
+
+
+class ColdStore:
+    """
+    Append-only archive of completed sessions.
+
+    Every session is written as its own gzip member holding one NDJSON line, so
+    segments stay valid .ndjson.gz files (`zcat` reads them end to end) while a
+    single session can be read back by seeking to its member. `index.ndjson`
+    maps session ids to (segment, offset, length) and is only ever appended to.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self._index: Dict[int, Tuple[str, int, int, int]] = {}
+        self._index_position = 0
+        self._lock = threading.Lock()
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob("segment-*.ndjson.gz"))
+
+    def _current_segment(self) -> Path:
+        segments = self._segments()
+        if segments and segments[-1].stat().st_size < self.segment_max_bytes:
+            return segments[-1]
+        return self.directory / SEGMENT_PATTERN.format(len(segments) + 1)
+
+    def _refresh_index(self) -> None:
+        # Other processes append to the index; only read what is new and
+        # leave a trailing partial line for the next refresh.
+        path = self.directory / INDEX_FILE
+        if not path.exists():
+            return
+        with path.open("rb") as index:
+            index.seek(self._index_position)
+            for line in index:
+                if not line.endswith(b"\n"):
+                    break
+                self._index_position += len(line)
+                entry = json.loads(line)
+                self._index[entry["session_id"]] = (
+                    entry["segment"], entry["offset"], entry["length"], entry["user_id"]
+                )
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Durably writes session records, then makes them visible in the index.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        segment = self._current_segment()
+        with segment.open("ab") as out:
+            for record in records:
+                member = gzip.compress(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+                offset = out.tell()
+                out.write(member)
+                entries.append({
+                    "session_id": record["id"],
+                    "user_id": record["user_id"],
+                    "segment": segment.name,
+                    "offset": offset,
+                    "length": len(member),
+                })
+            out.flush()
+            os.fsync(out.fileno())
+        with (self.directory / INDEX_FILE).open("a") as index:
+            index.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            index.flush()
+            os.fsync(index.fileno())
+
+    def get(self, session_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if session_id not in self._index:
+                self._refresh_index()
+            location = self._index.get(session_id)
+        if location is None:
+            return None
+        segment, offset, length, _ = location
+        with (self.directory / segment).open("rb") as source:
+            source.seek(offset)
+            return json.loads(gzip.decompress(source.read(length)))
+
+
+# None when ARCHIVE_DIR is not configured: nothing is archived or served from it
+cold_store: Optional[ColdStore] = (
+    ColdStore(ARCHIVE_DIR, ARCHIVE_SEGMENT_MAX_BYTES) if ARCHIVE_DIR else None
+)
+
+
+def _to_record(interview_session: InterviewSession, answers: List[Answer]) -> Dict[str, Any]:
+    return {
+        "id": interview_session.id,
+        "user_id": interview_session.user_id,
+        "category_id": interview_session.category_id,
+        "completed": interview_session.completed,
+        "started_at": interview_session.started_at.isoformat(),
+        "answers": [
+            {
+                "id": answer.id,
+                "question": answer.question,
+                "answer_text": answer.answer_text,
+                "feedback": answer.feedback,
+                "submitted_at": answer.submitted_at.isoformat(),
+            }
+            for answer in sorted(answers, key=lambda answer: answer.id)
+        ],
+    }
+
+
+def archive_completed_sessions(
+    db: Session,
+    store: ColdStore,
+    older_than: timedelta,
+    batch_size: int = 200,
+) -> int:
+    """
+    Moves completed sessions started before `older_than` ago, with their
+    answers, into cold storage. Rows are deleted only after the batch has been
+    written and indexed, so an interrupted run at worst archives a session twice.
+    """
+    cutoff = datetime.utcnow() - older_than
+    archived = 0
+    while True:
+        sessions = db.exec(
+            select(InterviewSession)
+            .where(InterviewSession.completed == True)  # noqa: E712
+            .where(InterviewSession.started_at < cutoff)
+            .order_by(InterviewSession.id)
+            .limit(batch_size)
+        ).all()
+        if not sessions:
+            return archived
+
+        session_ids = [interview_session.id for interview_session in sessions]
+        answers: Dict[int, List[Answer]] = {session_id: [] for session_id in session_ids}
+        for answer in db.exec(select(Answer).where(col(Answer.session_id).in_(session_ids))):
+            answers[answer.session_id].append(answer)
+
+        store.append([_to_record(s, answers[s.id]) for s in sessions])
+
+        db.exec(delete(Answer).where(col(Answer.session_id).in_(session_ids)))
+        db.exec(delete(InterviewSession).where(col(InterviewSession.id).in_(session_ids)))
+        db.commit()
+        archived += len(sessions)
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(
+        description="Archive completed interview sessions and purge expired Idempotency-Keys."
+    )
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args()
+    if cold_store is None:
+        parser.error(
+            "ARCHIVE_DIR is not set. Point it at persistent storage shared by all "
+            "app instances; archived sessions are deleted from the database."
+        )
+
+    with Session(engine) as db:
+        count = archive_completed_sessions(db, cold_store, timedelta(days=args.older_than_days))
+        purged = crud.purge_idempotency_records(db, timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS))
+    print(f"Archived {count} sessions into {cold_store.directory}")
+    print(f"Purged {purged} expired Idempotency-Key records")
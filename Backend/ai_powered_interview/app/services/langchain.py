@@ -1,9 +1,30 @@
 # app/services/langchain.py
 import os
+import re
+import json
+import time
 import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List
 from langchain_google_genai import ChatGoogleGenerativeAI  # Ensure correct package
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+from app.services.prompting import count_tokens, fit_to_budget
+from app.services.question_bank import fallback_question, fallback_questions
+from app.services.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+from app.tracing import run_in_executor_traced
+from app.settings import (
+    ANSWER_TOKEN_BUDGET,
+    LLM_BREAKER_FAILURE_THRESHOLD,
+    LLM_BREAKER_RESET_SECONDS,
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+    LLM_MAX_ATTEMPTS,
+    LLM_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -20,6 +41,15 @@ question_prompt = PromptTemplate(
     template="Generate a challenging interview question about {category_name}."
 )
 
+question_plan_prompt = PromptTemplate(
+    input_variables=["category_name", "count"],
+    template=(
+        "Generate {count} distinct interview questions about {category_name}, "
+        "ordered from easiest to most challenging, each one progressively harder.\n"
+        "Respond with only a JSON array of {count} strings and nothing else."
+    )
+)
+
 feedback_prompt = PromptTemplate(
     input_variables=["question", "user_response"],
     template=(
@@ -28,34 +58,177 @@ feedback_prompt = PromptTemplate(
     )
 )
 
+# One breaker for the upstream model, one latency window per kind of prompt
+# since feedback prompts are much longer than question prompts.
+breaker = CircuitBreaker(
+    failure_threshold=LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=LLM_BREAKER_RESET_SECONDS,
+)
+latencies = {
+    "question": LatencyTracker(default_delay=LLM_HEDGE_DEFAULT_DELAY_SECONDS),
+    "question_plan": LatencyTracker(default_delay=LLM_HEDGE_DEFAULT_DELAY_SECONDS),
+    "feedback": LatencyTracker(default_delay=LLM_HEDGE_DEFAULT_DELAY_SECONDS),
+}
+
+
+@dataclass
+class Generation:
+    """
+    Text produced for the caller. `fallback` is True when the model could not be
+    reached and the text is a local stand-in rather than a genuine response.
+    """
+    text: str
+    fallback: bool = False
+
+
+@dataclass
+class QuestionPlan:
+    """
+    Ordered questions for a whole session. `fallback` is True when some of them
+    had to come from the local question bank.
+    """
+    questions: List[str]
+    fallback: bool = False
+
+
 # Asynchronous Functions
 
-async def generate_question(category_name: str) -> str:
+async def _predict(kind: str, prompt: str, **log_fields: object) -> str:
     """
-    Generates an interview question based on the category.
+    Runs the model in a non-blocking way and records the prompt size next to
+    the call latency so the two can be correlated.
     """
-    prompt = question_prompt.format(category_name=category_name)
+    prompt_tokens = count_tokens(prompt)
+    started = time.perf_counter()
     try:
-        # Run the model in a non-blocking way
-        response = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: chat.predict(prompt)
+        return await run_in_executor_traced(
+            f"llm.{kind}", lambda: chat.predict(prompt), prompt_tokens=prompt_tokens
+        )
+    finally:
+        latency_ms = (time.perf_counter() - started) * 1000
+        extra = "".join(f" {key}={value}" for key, value in log_fields.items())
+        logger.info(
+            "llm_call kind=%s prompt_tokens=%d latency_ms=%.1f%s",
+            kind, prompt_tokens, latency_ms, extra,
         )
-        return response.strip()  # Clean up any extra spaces
+
+
+def _is_retryable(error: BaseException) -> bool:
+    return isinstance(error, Exception) and not isinstance(error, CircuitOpenError)
+
+
+async def _call_llm(kind: str, prompt: str, **log_fields: object) -> str:
+    """
+    Calls the model with a per-attempt deadline, a hedged duplicate request once
+    the attempt runs past the recent p95 latency, and a bounded number of
+    retries. Fails fast with CircuitOpenError while upstream is degraded.
+    """
+    tracker = latencies[kind]
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+        wait=wait_exponential(multiplier=0.2, max=2),
+        # Never retries a cancellation (not an Exception) or an open circuit
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    ):
+        with attempt:
+            if not breaker.allow():
+                raise CircuitOpenError(f"LLM circuit is {breaker.state}")
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    hedged(lambda: _predict(kind, prompt, **log_fields), tracker.hedge_delay()),
+                    timeout=LLM_TIMEOUT_SECONDS,
+                )
+            except asyncio.CancelledError:
+                breaker.record_cancelled()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            tracker.record(time.perf_counter() - started)
+    return response
+
+
+async def generate_question(category_name: str) -> Generation:
+    """
+    Generates an interview question based on the category, falling back to the
+    local question bank when the model is unavailable.
+    """
+    prompt = question_prompt.format(category_name=category_name)
+    try:
+        response = await _call_llm("question", prompt)
+        return Generation(text=response.strip())  # Clean up any extra spaces
     except Exception as e:
-        print(f"Error generating question: {e}")
-        return "Unable to generate a question at this time."
+        logger.warning("Error generating question: %r", e)
+        return Generation(text=fallback_question(category_name), fallback=True)
+
+_LIST_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+(.+?)\s*$")
+
 
-async def generate_feedback(question: str, user_response: str) -> str:
+def _parse_question_list(response: str) -> List[str]:
+    """
+    Extracts questions from the first JSON array of strings in the reply,
+    wherever it appears (e.g. after a preamble or inside a code fence).
+    Without one, only numbered or bulleted lines are taken as questions, so
+    preambles and fences never end up in a session.
+    """
+    candidates: List[object] = []
+    decoder = json.JSONDecoder()
+    for bracket in re.finditer(r"\[", response):
+        try:
+            parsed, _ = decoder.raw_decode(response, bracket.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, list) and any(isinstance(item, str) for item in parsed):
+            candidates = parsed
+            break
+    else:
+        for line in response.splitlines():
+            item = _LIST_ITEM.match(line)
+            if item and not item.group(1).endswith(":"):
+                candidates.append(item.group(1))
+    questions: List[str] = []
+    for candidate in candidates:
+        if isinstance(candidate, str) and candidate.strip() and candidate.strip() not in questions:
+            questions.append(candidate.strip())
+    return questions
+
+
+async def generate_question_plan(category_name: str, count: int) -> QuestionPlan:
+    """
+    Generates all questions for a session in a single call. Missing questions
+    (unusable reply or model unavailable) are filled from the local bank.
+    """
+    prompt = question_plan_prompt.format(category_name=category_name, count=count)
+    try:
+        questions = _parse_question_list(await _call_llm("question_plan", prompt))[:count]
+    except Exception as e:
+        logger.warning("Error generating question plan: %r", e)
+        questions = []
+    if len(questions) == count:
+        return QuestionPlan(questions=questions)
+    missing = [q for q in fallback_questions(category_name, count) if q not in questions]
+    return QuestionPlan(questions=questions + missing[:count - len(questions)], fallback=True)
+
+async def generate_feedback(question: str, user_response: str) -> Generation:
     """
     Generates feedback for a given question and user response.
+
+    Over-long answers are trimmed to ANSWER_TOKEN_BUDGET tokens before they
+    reach the model; the omitted middle is replaced with a visible marker.
     """
-    prompt = feedback_prompt.format(question=question, user_response=user_response)
+    answer = fit_to_budget(user_response, ANSWER_TOKEN_BUDGET)
+    prompt = feedback_prompt.format(question=question, user_response=answer.text)
     try:
-        # Run the model in a non-blocking way
-        response = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: chat.predict(prompt)
+        response = await _call_llm(
+            "feedback",
+            prompt,
+            answer_tokens=answer.original_tokens,
+            truncated=answer.truncated,
         )
-        return response.strip()  # Clean up any extra spaces
+        return Generation(text=response.strip())  # Clean up any extra spaces
     except Exception as e:
-        print(f"Error generating feedback: {e}")
-        return "Unable to generate feedback at this time."
+        logger.warning("Error generating feedback: %r", e)
+        return Generation(text="Unable to generate feedback at this time.", fallback=True)
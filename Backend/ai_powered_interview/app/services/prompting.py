@@ -0,0 +1,74 @@
+# app/services/prompting.py
+import math
+import re
+from dataclasses import dataclass
+
+# Words, numbers and individual punctuation marks. Long words are split into
+# ~4 character pieces, which is close to how SentencePiece-style tokenizers
+# (Gemini included) behave on English text, without a network round trip.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = "\n[... {omitted} tokens of the answer were omitted here to fit the review budget ...]\n"
+
+
+@dataclass
+class BudgetedText:
+    text: str
+    tokens: int
+    original_tokens: int
+
+    @property
+    def truncated(self) -> bool:
+        return self.tokens < self.original_tokens
+
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, math.ceil(len(piece) / _CHARS_PER_TOKEN))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in the given text locally.
+    """
+    return sum(_piece_tokens(match.group()) for match in _TOKEN_PATTERN.finditer(text))
+
+
+def fit_to_budget(text: str, budget: int) -> BudgetedText:
+    """
+    Trims text to at most `budget` tokens, keeping the beginning and the end
+    of the text and replacing the middle with a clear omission marker.
+    """
+    matches = list(_TOKEN_PATTERN.finditer(text))
+    weights = [_piece_tokens(match.group()) for match in matches]
+    total = sum(weights)
+    if total <= budget:
+        return BudgetedText(text=text, tokens=total, original_tokens=total)
+
+    # Reserve room for the marker itself, then keep roughly two thirds of the
+    # budget from the head (where the answer is usually framed) and the rest
+    # from the tail (where it is usually concluded).
+    available = max(0, budget - count_tokens(TRUNCATION_MARKER.format(omitted=total)))
+    head_budget = (available * 2) // 3
+    tail_budget = available - head_budget
+
+    head_end, used = 0, 0
+    for match, weight in zip(matches, weights):
+        if used + weight > head_budget:
+            break
+        used += weight
+        head_end = match.end()
+    head_tokens = used
+
+    tail_start, used = len(text), 0
+    for match, weight in zip(reversed(matches), reversed(weights)):
+        if used + weight > tail_budget or match.start() < head_end:
+            break
+        used += weight
+        tail_start = match.start()
+    tail_tokens = used
+
+    omitted = total - head_tokens - tail_tokens
+    marker = TRUNCATION_MARKER.format(omitted=omitted)
+    trimmed = text[:head_end].rstrip() + marker + text[tail_start:].lstrip()
+    return BudgetedText(text=trimmed, tokens=count_tokens(trimmed), original_tokens=total)
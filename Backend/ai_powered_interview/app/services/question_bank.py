@@ -0,0 +1,61 @@
+# app/services/question_bank.py
+import random
+from typing import Dict, List
+
+# Served when the LLM is unavailable so an interview can still progress.
+GENERAL_QUESTIONS: List[str] = [
+    "Tell me about a challenging problem you solved recently and how you approached it.",
+    "Describe a time you had to learn a new technology quickly. What was your process?",
+    "How do you decide between two technically valid solutions to the same problem?",
+    "Walk me through how you would debug an issue that only happens in production.",
+    "Describe a project you are proud of and the trade-offs you made along the way.",
+    "How do you make sure the code you ship is correct and maintainable?",
+]
+
+CATEGORY_QUESTIONS: Dict[str, List[str]] = {
+    "software": [
+        "What is the difference between a process and a thread?",
+        "Explain the SOLID principles and give an example of one in practice.",
+        "How would you design a rate limiter for a public API?",
+        "What are the trade-offs between SQL and NoSQL databases?",
+    ],
+    "data": [
+        "How do you handle missing values in a dataset?",
+        "Explain the bias-variance trade-off.",
+        "How would you evaluate a classifier on a heavily imbalanced dataset?",
+        "What is the difference between bagging and boosting?",
+    ],
+    "python": [
+        "What is the Global Interpreter Lock and how does it affect concurrency?",
+        "Explain the difference between a list and a generator.",
+        "How do decorators work in Python?",
+    ],
+    "frontend": [
+        "How does the browser render a page from HTML, CSS and JavaScript?",
+        "What causes unnecessary re-renders in React and how do you avoid them?",
+    ],
+}
+
+
+def fallback_questions(category_name: str, count: int) -> List[str]:
+    """
+    Picks up to `count` distinct questions from the local bank, preferring ones
+    that match the category and topping up with general questions.
+    """
+    name = category_name.lower()
+    matching = [
+        question
+        for keyword, questions in CATEGORY_QUESTIONS.items()
+        if keyword in name
+        for question in questions
+    ]
+    picked = random.sample(matching, min(count, len(matching)))
+    general = random.sample(GENERAL_QUESTIONS, min(count - len(picked), len(GENERAL_QUESTIONS)))
+    return picked + general
+
+
+def fallback_question(category_name: str) -> str:
+    """
+    Picks a question from the local bank, preferring ones that match the category.
+    """
+    return fallback_questions(category_name, 1)[0]
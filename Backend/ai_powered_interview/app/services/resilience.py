@@ -0,0 +1,123 @@
+# app/services/resilience.py
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+
+class LatencyTracker:
+    """
+    Keeps a rolling window of successful call latencies and derives the delay
+    after which a hedged request is worth sending.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        default_delay: float = 3.0,
+        min_delay: float = 0.25,
+    ) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+    def hedge_delay(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return self.default_delay
+        p95 = self.percentile(0.95)
+        assert p95 is not None
+        return max(self.min_delay, p95)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and fails fast for
+    `reset_timeout` seconds, then lets a single trial call through.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_cancelled(self) -> None:
+        """
+        Releases the trial slot of a call that was cancelled before it could
+        tell whether upstream recovered, so the next caller makes the trial.
+        """
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+async def hedged(call: Callable[[], Awaitable[T]], hedge_delay: float) -> T:
+    """
+    Awaits `call()`; if it has not finished after `hedge_delay` seconds a second
+    identical call is started and whichever succeeds first wins.
+    """
+    tasks = {asyncio.ensure_future(call())}
+    error: Optional[BaseException] = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if not done:
+            tasks.add(asyncio.ensure_future(call()))
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        # Losers (and everything, when the caller's deadline cancels us) are
+        # cancelled; a thread already running in the executor finishes on its own.
+        for task in tasks:
+            task.cancel()
@@ -1,5 +1,5 @@
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 try:
     config = Config(".env")
@@ -7,8 +7,56 @@ except FileNotFoundError:
     config = Config()
 
 DATABASE_URL = config("DATABASE_URL", cast=Secret)
+# Optional read replicas, comma separated. Read-only routes are spread across
+# the healthy ones and fall back to DATABASE_URL when none are reachable.
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", cast=CommaSeparatedStrings, default="")
+REPLICA_HEALTH_CHECK_SECONDS = config("REPLICA_HEALTH_CHECK_SECONDS", cast=float, default=10.0)
+# Keeps an unreachable replica from stalling the request that probes it
+REPLICA_CONNECT_TIMEOUT_SECONDS = config("REPLICA_CONNECT_TIMEOUT_SECONDS", cast=int, default=2)
+# How long a client reads from the primary after it has written
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", cast=int, default=30)
 SECRET_KEY = config("SECRET_KEY", cast=str)
 ALGORITHM = config("ALGORITHM", default="HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = config("ACCESS_TOKEN_EXPIRE_MINUTES", cast=int, default=30)
 
+# Number of questions asked in one interview session
+QUESTIONS_PER_SESSION = config("QUESTIONS_PER_SESSION", cast=int, default=5)
+# After this long an unfinished answer no longer blocks the session's question
+ANSWER_CLAIM_LEASE_SECONDS = config("ANSWER_CLAIM_LEASE_SECONDS", cast=int, default=120)
+# Idempotency-Key records older than this are purged by the archive job, after
+# which a retry with the same key is treated as a new request
+IDEMPOTENCY_KEY_TTL_SECONDS = config("IDEMPOTENCY_KEY_TTL_SECONDS", cast=int, default=24 * 3600)
 
+# Limits applied to user answers before they are sent to the LLM
+MAX_REQUEST_BODY_BYTES = config("MAX_REQUEST_BODY_BYTES", cast=int, default=256 * 1024)
+MAX_ANSWER_CHARS = config("MAX_ANSWER_CHARS", cast=int, default=20000)
+ANSWER_TOKEN_BUDGET = config("ANSWER_TOKEN_BUDGET", cast=int, default=1500)
+
+# Resilience of calls to the LLM
+LLM_TIMEOUT_SECONDS = config("LLM_TIMEOUT_SECONDS", cast=float, default=20.0)
+LLM_MAX_ATTEMPTS = config("LLM_MAX_ATTEMPTS", cast=int, default=2)
+LLM_HEDGE_DEFAULT_DELAY_SECONDS = config("LLM_HEDGE_DEFAULT_DELAY_SECONDS", cast=float, default=3.0)
+LLM_BREAKER_FAILURE_THRESHOLD = config("LLM_BREAKER_FAILURE_THRESHOLD", cast=int, default=5)
+LLM_BREAKER_RESET_SECONDS = config("LLM_BREAKER_RESET_SECONDS", cast=float, default=30.0)
+
+# Cold storage for completed sessions (see app/services/archive.py). Archived
+# rows are deleted from the database, so ARCHIVE_DIR must be persistent storage
+# shared by every app instance (not the container filesystem). There is no
+# default: the archive job refuses to run without it, and the app only serves
+# archived sessions when it is set.
+ARCHIVE_DIR = config("ARCHIVE_DIR", default=None)
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", cast=int, default=90)
+ARCHIVE_SEGMENT_MAX_BYTES = config("ARCHIVE_SEGMENT_MAX_BYTES", cast=int, default=64 * 1024 * 1024)
+
+# Rows fetched per round trip by streaming exports
+EXPORT_CHUNK_ROWS = config("EXPORT_CHUNK_ROWS", cast=int, default=1000)
+
+# Level of the "app" loggers, which carry per-call LLM token counts at INFO
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+
+# Request tracing (see app/tracing.py). Fraction of requests recorded, decided
+# when the request starts; traces go to the collector endpoint when set, else
+# are appended as OTLP/JSON lines to the export file.
+TRACE_SAMPLE_RATE = config("TRACE_SAMPLE_RATE", cast=float, default=0.0)
+TRACE_EXPORT_PATH = config("TRACE_EXPORT_PATH", default="traces.jsonl")
+TRACE_EXPORT_ENDPOINT = config("TRACE_EXPORT_ENDPOINT", default="")
@@ -0,0 +1,392 @@
+# app/tracing.py
+import abc
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.settings import TRACE_EXPORT_ENDPOINT, TRACE_EXPORT_PATH, TRACE_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+T = TypeVar("T")
+
+SERVICE_NAME = "interview-management"
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+@dataclass
+class _Trace:
+    trace_id: str
+    sampled: bool
+    spans: List["Span"] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    name: str
+    trace: _Trace
+    span_id: str
+    parent_span_id: Optional[str]
+    kind: int = KIND_INTERNAL
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: int = STATUS_OK
+
+    @property
+    def recording(self) -> bool:
+        return self.trace.sampled
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def set_error(self, exception_type: Optional[str] = None) -> None:
+        if self.recording:
+            self.status = STATUS_ERROR
+            if exception_type:
+                self.attributes["exception.type"] = exception_type
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+# Shared by everything that is not recorded (unsampled traces, and SQL or
+# crud calls made outside any trace), so those cost no ids or allocations.
+NOOP_SPAN = Span(
+    name="", trace=_Trace(trace_id="0" * 32, sampled=False), span_id="0" * 16, parent_span_id=None
+)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    """
+    Wraps spans in an OTLP/JSON ExportTraceServiceRequest.
+    """
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "app.tracing"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]
+    }
+
+
+class _BackgroundExporter(abc.ABC):
+    """
+    Hands finished traces to a daemon thread so request handling never waits
+    on the export. Traces are dropped if the queue is full.
+    """
+
+    # Export failures are logged at most this often; the rest are counted
+    ERROR_LOG_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, max_queue: int = 1000) -> None:
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._failures_since_log = 0
+        self._last_error_logged = float("-inf")
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass  # Drop traces rather than slow down requests
+
+    def flush(self) -> None:
+        """
+        Blocks until every trace exported so far has been written.
+        """
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self._write(otlp_payload(spans))
+            except Exception as e:
+                self._log_failure(e)
+            finally:
+                self._queue.task_done()
+
+    def _log_failure(self, error: Exception) -> None:
+        self._failures_since_log += 1
+        now = time.monotonic()
+        if now - self._last_error_logged < self.ERROR_LOG_INTERVAL_SECONDS:
+            return
+        logger.warning(
+            "trace_export_failed exporter=%s failures=%d error=%r",
+            type(self).__name__, self._failures_since_log, error,
+        )
+        self._failures_since_log = 0
+        self._last_error_logged = now
+
+    @abc.abstractmethod
+    def _write(self, payload: Dict[str, Any]) -> None:
+        """
+        Delivers one OTLP/JSON export request; runs on the exporter thread.
+        """
+
+
+class FileSpanExporter(_BackgroundExporter):
+    """
+    Appends one OTLP/JSON request per trace as a line of the given file.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        with open(self.path, "a") as out:
+            out.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class HttpSpanExporter(_BackgroundExporter):
+    """
+    POSTs OTLP/JSON to a collector's /v1/traces endpoint.
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        super().__init__()
+        self.endpoint = endpoint
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+class Tracer:
+    """
+    Creates spans linked through a context variable. Whether a trace is
+    recorded is decided once, when its root span starts (head sampling), and
+    the finished trace is exported when the root span ends.
+    """
+
+    def __init__(self, exporter: Any, sample_rate: float) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+            "current_span", default=None
+        )
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def begin(self, name: str, kind: int = KIND_INTERNAL, root: bool = True) -> Span:
+        """
+        Starts a span under the current one. Without a current span a new
+        trace is started if `root` is set and the trace is sampled.
+        """
+        parent = self._current.get()
+        if parent is None:
+            if not root or random.random() >= self.sample_rate:
+                return NOOP_SPAN
+            trace = _Trace(trace_id=os.urandom(16).hex(), sampled=True)
+        elif not parent.recording:
+            return NOOP_SPAN
+        else:
+            trace = parent.trace
+        return Span(
+            name=name,
+            trace=trace,
+            span_id=os.urandom(8).hex(),
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            start_ns=time.time_ns(),
+        )
+
+    def finish(self, span: Span) -> None:
+        if not span.recording:
+            return
+        span.end_ns = time.time_ns()
+        span.trace.spans.append(span)
+        if span.parent_span_id is None:
+            self.exporter.export(span.trace.spans)
+
+    @contextmanager
+    def span(
+        self, name: str, kind: int = KIND_INTERNAL, root: bool = True, **attributes: Any
+    ) -> Iterator[Span]:
+        span = self.begin(name, kind, root)
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(type(e).__name__)
+            raise
+        finally:
+            self._current.reset(token)
+            self.finish(span)
+
+
+def _build_exporter() -> Any:
+    if TRACE_EXPORT_ENDPOINT:
+        return HttpSpanExporter(TRACE_EXPORT_ENDPOINT)
+    return FileSpanExporter(TRACE_EXPORT_PATH)
+
+
+tracer = Tracer(_build_exporter(), sample_rate=TRACE_SAMPLE_RATE)
+
+
+def traced(func: F) -> F:
+    """
+    Records each call of `func` made within a trace as a span named after its
+    module and function.
+    """
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tracer.span(name, root=False):
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+async def run_in_executor_traced(name: str, func: Callable[[], T], **attributes: Any) -> T:
+    """
+    Runs a blocking call in the default executor under a span, keeping the
+    caller's span as parent across the thread hop and recording the time the
+    call spent queued before a worker picked it up.
+    """
+    with tracer.span(name, kind=KIND_CLIENT, **attributes):
+        submitted_ns = time.time_ns()
+
+        def run() -> T:
+            queued = tracer.begin(f"{name}.queued")
+            if queued.recording:
+                queued.start_ns = submitted_ns
+                tracer.finish(queued)
+            return func()
+
+        # The worker thread sees a copy of the caller's context, current span included
+        context = contextvars.copy_context()
+        return await asyncio.get_event_loop().run_in_executor(None, context.run, run)
+
+
+# SQL statements, for every engine (primary, replicas and test engines)
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = tracer.begin("sql", kind=KIND_CLIENT, root=False)
+    span.set_attribute("db.system", conn.dialect.name)
+    span.set_attribute("db.statement", statement[:500])
+    context._trace_span = span
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        tracer.finish(span)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.set_error(type(exception_context.original_exception).__name__)
+        tracer.finish(span)
+
+
+class TracedJSONResponse(JSONResponse):
+    """
+    JSONResponse whose body serialization is recorded as a span.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with tracer.span("serialize"):
+            return super().render(content)
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of every HTTP request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.span(f"{scope['method']} {scope['path']}", kind=KIND_SERVER) as span:
+            span.set_attribute("http.method", scope["method"])
+            span.set_attribute("http.target", scope["path"])
+
+            async def traced_send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_error()
+                await send(message)
+
+            await self.app(scope, receive, traced_send)
+            route = scope.get("route")
+            if route is not None and span.recording:
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
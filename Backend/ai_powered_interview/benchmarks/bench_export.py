@@ -0,0 +1,126 @@
+"""
+Throughput and peak RSS of GET /export/history against a seeded SQLite file.
+
+    python -m benchmarks.bench_export --sessions 200000 --format csv
+
+Peak RSS should stay flat as --sessions grows; if it scales with the row
+count, something in the export path is materialising the result set.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+
+from app.database import get_read_session, get_session, make_engine
+from app.dependencies import get_current_user
+from app.main import app
+from app.models import Answer, Category, Session as InterviewSession, User
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed(engine, sessions: int, answers_per_session: int, batch: int = 2000) -> None:
+    SQLModel.metadata.create_all(engine)
+    now = datetime.utcnow()
+    feedback = "Solid answer. Consider discussing time complexity and edge cases. " * 8
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            "id": 1, "username": "bench", "email": "bench@example.com",
+            "hashed_password": "x", "created_at": now, "role": "user",
+        }])
+        connection.execute(insert(Category), [{"id": 1, "name": "Python"}])
+        for start in range(1, sessions + 1, batch):
+            ids = range(start, min(start + batch, sessions + 1))
+            connection.execute(insert(InterviewSession), [{
+                "id": i, "user_id": 1, "category_id": 1, "completed": True, "started_at": now,
+            } for i in ids])
+            connection.execute(insert(Answer), [{
+                "session_id": i, "question": f"Question {n} of session {i}?",
+                "answer_text": f"Answer {n} of session {i}.", "feedback": feedback,
+                "submitted_at": now,
+            } for i in ids for n in range(answers_per_session)])
+
+
+async def stream_export(export_format: str) -> tuple:
+    """
+    Drives the ASGI app directly and discards the body as it arrives;
+    TestClient would buffer the whole response and hide the streaming.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/export/history", "raw_path": b"/export/history",
+        "query_string": f"format={export_format}".encode(), "root_path": "",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    counts = {"rows": 0, "bytes": 0}
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Stay connected until the response is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            counts["bytes"] += len(body)
+            counts["rows"] += body.count(b"\n")
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return counts["rows"], counts["bytes"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--answers-per-session", type=int, default=5)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        seed(engine, args.sessions, args.answers_per_session)
+
+        def session_override():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = session_override
+        app.dependency_overrides[get_read_session] = session_override
+        app.dependency_overrides[get_current_user] = lambda: User(id=1, username="bench", email="bench@example.com", hashed_password="x")
+
+        rss_before = _peak_rss_mb()
+        started = time.perf_counter()
+        rows, size = asyncio.run(stream_export(args.format))
+        elapsed = time.perf_counter() - started
+
+    print(f"rows:        {rows}")
+    print(f"bytes:       {size / 1e6:.1f} MB")
+    print(f"elapsed:     {elapsed:.2f} s")
+    print(f"throughput:  {rows / elapsed:,.0f} rows/s, {size / 1e6 / elapsed:.1f} MB/s")
+    print(f"peak RSS:    {_peak_rss_mb():.1f} MB (before export: {rss_before:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+
+# Never reach the configured Postgres from tests; every route gets the
+# in-memory engine below through dependency overrides.
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.database import create_search_index, get_read_session, get_session
+from app.main import app
+from app.routers import session as session_router
+from app.services.langchain import Generation, QuestionPlan
+
+
+class QueryCounter:
+    """
+    Records every SQL statement sent to the engine while active.
+    """
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        self.statements: List[str] = []
+        self._active = False
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self._active:
+            self.statements.append(statement)
+
+    @contextmanager
+    def count(self) -> Iterator["QueryCounter"]:
+        self.statements = []
+        self._active = True
+        try:
+            yield self
+        finally:
+            self._active = False
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+
+# Maximum number of SQL statements each route may issue. A route going over
+# budget usually means a new N+1 pattern or a reload after commit; raise a
+# budget only together with the change that genuinely needs it.
+QUERY_BUDGETS: Dict[str, int] = {
+    "POST /users/register": 2,
+    "POST /users/login": 1,
+    "POST /categories/": 4,
+    "GET /categories/": 2,
+    # user, category, session insert, stats upsert, refresh
+    "POST /session/init": 5,
+    # user, session, claim (compare-and-swap), answer count, session update
+    # (compare-and-swap), stats upsert, answer insert
+    "POST /session/answer": 7,
+    # the above plus reserving the key and storing the response
+    "POST /session/answer with Idempotency-Key": 9,
+    "GET /session/final": 3,
+    "GET /export/history": 2,
+    "GET /admin/analytics/categories": 2,
+    "GET /search/": 2,
+}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    create_search_index(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def queries(engine) -> QueryCounter:
+    return QueryCounter(engine)
+
+
+@pytest.fixture
+def query_budget(queries: QueryCounter) -> Callable[[str], None]:
+    """
+    Asserts that the statements counted by `queries` fit the route's budget.
+    """
+
+    def check(route: str) -> None:
+        budget = QUERY_BUDGETS[route]
+        assert len(queries) <= budget, (
+            f"{route} issued {len(queries)} SQL statements (budget {budget}):\n"
+            + "\n".join(queries.statements)
+        )
+
+    return check
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """
+    Replaces the LLM with deterministic stand-ins and records the calls made.
+    """
+    calls: List[str] = []
+
+    async def fake_generate_question(category_name: str) -> Generation:
+        calls.append("question")
+        return Generation(text=f"{category_name} question {len(calls)}?")
+
+    async def fake_generate_question_plan(category_name: str, count: int) -> QuestionPlan:
+        calls.append("question_plan")
+        return QuestionPlan(questions=[f"{category_name} question {i}?" for i in range(1, count + 1)])
+
+    async def fake_generate_feedback(question: str, user_response: str) -> Generation:
+        calls.append("feedback")
+        return Generation(text=f"Feedback on: {user_response}")
+
+    monkeypatch.setattr(session_router, "generate_question", fake_generate_question)
+    monkeypatch.setattr(session_router, "generate_question_plan", fake_generate_question_plan)
+    monkeypatch.setattr(session_router, "generate_feedback", fake_generate_feedback)
+    return calls
+
+
+@pytest.fixture
+def client(engine, llm) -> Iterator[TestClient]:
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    # Not used as a context manager: the lifespan would create tables on the
+    # configured database instead of the test engine.
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def user_client(client: TestClient) -> TestClient:
+    """
+    A client logged in as a freshly registered user.
+    """
+    client.post(
+        "/users/register",
+        json={"username": "ada", "email": "ada@example.com", "password": "secret"},
+    )
+    response = client.post("/users/login", data={"username": "ada", "password": "secret"})
+    assert response.status_code == 200
+    return client
+
+
+class Interviews:
+    """
+    Runs interview sessions through the API for the client's logged-in user.
+    """
+
+    def __init__(self, client: TestClient) -> None:
+        self.client = client
+
+    def start(self, category: str = "Python", answers: Iterable[str] = ()) -> Dict[str, str]:
+        """
+        Starts a session in `category` (created if needed), submits `answers`
+        and returns the headers that address the session.
+        """
+        response = self.client.post("/categories/", json={"name": category})
+        if response.status_code == 200:
+            category_id = response.json()["id"]
+        else:
+            [category_id] = [
+                c["id"] for c in self.client.get("/categories/").json() if c["name"] == category
+            ]
+        response = self.client.post(
+            "/session/init", json={}, headers={"X-Category-ID": str(category_id)}
+        )
+        assert response.status_code == 200
+        headers = {"X-Category-ID": str(category_id), "Session-ID": str(response.json()["id"])}
+        self.answer(headers, answers)
+        return headers
+
+    def answer(self, headers: Dict[str, str], answers: Iterable[str]) -> None:
+        for answer_text in answers:
+            response = self.client.post(
+                "/session/answer", json={"answer_text": answer_text}, headers=headers
+            )
+            assert response.status_code == 200
+
+
+@pytest.fixture
+def interviews(user_client: TestClient) -> Interviews:
+    return Interviews(user_client)
@@ -0,0 +1,89 @@
+from fastapi.testclient import TestClient
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, delete, select
+
+from app import migrations
+from app.models import CategoryDailyStats, Session as InterviewSession, User
+
+
+def _make_admin(engine, username: str = "ada") -> None:
+    with Session(engine) as db:
+        user = db.exec(select(User).where(User.username == username)).one()
+        user.role = "admin"
+        db.add(user)
+        db.commit()
+
+
+def test_category_analytics_from_rollups(
+    user_client: TestClient, interviews, engine, queries, query_budget
+) -> None:
+    interviews.start(answers=[f"Answer {i}" for i in range(5)])
+    interviews.start(answers=["Only one"])  # abandoned
+
+    assert user_client.get("/admin/analytics/categories").status_code == 403
+    _make_admin(engine)
+
+    with queries.count():
+        response = user_client.get("/admin/analytics/categories", params={"days": 7})
+    assert response.status_code == 200
+    query_budget("GET /admin/analytics/categories")
+
+    [stats] = response.json()
+    assert stats["category_name"] == "Python"
+    assert stats["sessions_started"] == 2
+    assert stats["sessions_completed"] == 1
+    assert stats["completion_rate"] == 0.5
+    assert stats["average_completion_seconds"] >= 0
+    assert [day["answers"] for day in stats["answers_per_day"]] == [6]
+
+
+def test_completion_counts_towards_the_day_the_session_started(
+    user_client: TestClient, interviews, engine
+) -> None:
+    headers = interviews.start()
+    started_at = datetime.utcnow() - timedelta(days=10)
+    with Session(engine) as db:
+        interview_session = db.get(InterviewSession, int(headers["Session-ID"]))
+        interview_session.started_at = started_at
+        db.add(interview_session)
+        db.commit()
+    interviews.answer(headers, [f"Answer {i}" for i in range(5)])
+    _make_admin(engine)
+
+    # Started before the window: its completion is outside the window too
+    [recent] = user_client.get("/admin/analytics/categories", params={"days": 7}).json()
+    assert recent["sessions_completed"] == 0
+    assert recent["completion_rate"] == 0.0
+    assert [day["answers"] for day in recent["answers_per_day"]] == [5]
+
+    [everything] = user_client.get("/admin/analytics/categories", params={"days": 30}).json()
+    assert everything["sessions_completed"] == 1
+    assert everything["average_completion_seconds"] >= 10 * 24 * 3600
+
+
+def test_backfill_rebuilds_rollups_from_existing_rows(
+    user_client: TestClient, interviews, engine
+) -> None:
+    interviews.start(answers=[f"Answer {i}" for i in range(5)])
+    interviews.start(answers=["Only one"])
+    interviews.start("Algorithms", answers=["Sorted"])
+    _make_admin(engine)
+    expected = user_client.get("/admin/analytics/categories").json()
+
+    # Rows written before the rollups existed have no counters
+    with Session(engine) as db:
+        db.exec(delete(CategoryDailyStats))
+        db.commit()
+    assert user_client.get("/admin/analytics/categories").json() == []
+
+    assert migrations.backfill_category_stats(engine) == 2
+    # Re-running overwrites the counters instead of adding to them
+    migrations.backfill_category_stats(engine)
+
+    rebuilt = user_client.get("/admin/analytics/categories").json()
+    for stats in expected + rebuilt:
+        stats["average_completion_seconds"] = stats["average_completion_seconds"] is not None
+    assert sorted(rebuilt, key=lambda s: s["category_id"]) == sorted(
+        expected, key=lambda s: s["category_id"]
+    )
@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.models import Answer, Category, Session as InterviewSession, User
+from app.services.archive import ColdStore, archive_completed_sessions
+
+
+def _seed(db: Session, started_at: datetime, completed: bool = True) -> int:
+    interview_session = InterviewSession(
+        user_id=1, category_id=1, completed=completed, started_at=started_at
+    )
+    db.add(interview_session)
+    db.commit()
+    for i in range(3):
+        db.add(Answer(
+            session_id=interview_session.id,
+            question=f"Question {i}",
+            answer_text=f"Answer {i}",
+            feedback=f"Feedback {i}",
+        ))
+    db.commit()
+    return interview_session.id
+
+
+def test_archive_moves_old_completed_sessions_to_cold_storage(tmp_path: Path) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    store = ColdStore(str(tmp_path), segment_max_bytes=1024 * 1024)
+
+    with Session(engine) as db:
+        db.add(User(username="ada", email="ada@example.com", hashed_password="x"))
+        db.add(Category(name="Python"))
+        db.commit()
+        old = _seed(db, datetime.utcnow() - timedelta(days=120))
+        recent = _seed(db, datetime.utcnow())
+        in_progress = _seed(db, datetime.utcnow() - timedelta(days=120), completed=False)
+
+        assert archive_completed_sessions(db, store, timedelta(days=90)) == 1
+
+        remaining = {s.id for s in db.exec(select(InterviewSession)).all()}
+        assert remaining == {recent, in_progress}
+        assert all(a.session_id != old for a in db.exec(select(Answer)).all())
+
+    # A fresh reader (e.g. another worker) finds the session through the index
+    record = ColdStore(str(tmp_path), segment_max_bytes=1024 * 1024).get(old)
+    assert record is not None
+    assert record["user_id"] == 1
+    assert [a["feedback"] for a in record["answers"]] == ["Feedback 0", "Feedback 1", "Feedback 2"]
+
+    # Segments remain plain NDJSON.gz files
+    segment = next(tmp_path.glob("segment-*.ndjson.gz"))
+    with gzip.open(segment, "rt") as lines:
+        assert [json.loads(line)["id"] for line in lines] == [old]
+
+
+def test_archive_job_refuses_to_run_without_archive_dir() -> None:
+    env = {key: value for key, value in os.environ.items() if key != "ARCHIVE_DIR"}
+    result = subprocess.run(
+        [sys.executable, "-m", "app.services.archive"],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**env, "DATABASE_URL": "sqlite://"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode != 0
+    assert "ARCHIVE_DIR is not set" in result.stderr
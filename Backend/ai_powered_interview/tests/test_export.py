@@ -0,0 +1,32 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+
+def test_export_streams_ndjson_and_csv(
+    user_client: TestClient, interviews, queries, query_budget
+) -> None:
+    headers = interviews.start(answers=[f"Answer {i}" for i in range(5)])
+    session_id = int(headers["Session-ID"])
+
+    with queries.count():
+        response = user_client.get("/export/history")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["answer_text"] for row in rows] == [f"Answer {i}" for i in range(5)]
+    assert {row["session_id"] for row in rows} == {session_id}
+    # One cursor no matter how many rows: no per-session or per-answer queries
+    query_budget("GET /export/history")
+
+    response = user_client.get("/export/history", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[0]["question"] == "Python question 1?"
+
+
+def test_export_of_other_users_requires_admin(user_client: TestClient) -> None:
+    response = user_client.get("/export/history", params={"user_id": 999})
+    assert response.status_code == 403
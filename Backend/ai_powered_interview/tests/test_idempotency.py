@@ -0,0 +1,174 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app import crud
+from app.database import READ_PRIMARY_COOKIE
+from app.models import Answer, IdempotencyRecord, Session as InterviewSession, User
+
+
+def _answer_count(engine) -> int:
+    with Session(engine) as db:
+        return db.exec(select(func.count()).select_from(Answer)).one()
+
+
+def test_retry_with_same_key_replays_response(
+    user_client: TestClient, interviews, engine, queries, query_budget, llm
+) -> None:
+    headers = {**interviews.start(), "Idempotency-Key": "answer-1"}
+
+    with queries.count():
+        first = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert first.status_code == 200
+    query_budget("POST /session/answer with Idempotency-Key")
+
+    retry = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert llm.count("feedback") == 1
+    assert _answer_count(engine) == 1
+
+    reused = user_client.post("/session/answer", json={"answer_text": "Geese"}, headers=headers)
+    assert reused.status_code == 422
+
+
+def test_concurrent_submission_for_same_question_is_rejected(
+    user_client: TestClient, interviews, engine, llm
+) -> None:
+    headers = interviews.start()
+    session_id = int(headers["Session-ID"])
+
+    # Another request has claimed the current question and is waiting on the LLM
+    with Session(engine) as db:
+        version = db.get(InterviewSession, session_id).version
+        assert crud.claim_session_for_answer(db, session_id, version, lease_seconds=120) == version + 1
+        # A stale read of the same version can no longer claim it
+        assert crud.claim_session_for_answer(db, session_id, version, lease_seconds=120) is None
+
+    response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 409
+    assert llm.count("feedback") == 0
+
+    # An expired claim (e.g. the worker died) no longer blocks the question
+    with Session(engine) as db:
+        interview_session = db.get(InterviewSession, session_id)
+        interview_session.answer_claimed_at = datetime(2000, 1, 1)
+        db.add(interview_session)
+        db.commit()
+    response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 200
+    assert _answer_count(engine) == 1
+
+
+def test_failed_attempt_releases_claim_and_key(
+    user_client: TestClient, interviews, engine, llm, monkeypatch
+) -> None:
+    from app.routers import session as session_router
+    from app.services.langchain import Generation
+
+    headers = {**interviews.start(), "Idempotency-Key": "answer-1"}
+
+    async def unavailable(question: str, user_response: str) -> Generation:
+        return Generation(text="Unable to generate feedback at this time.", fallback=True)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(session_router, "generate_feedback", unavailable)
+        response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 503
+
+    response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 200
+    assert _answer_count(engine) == 1
+
+
+def test_key_left_in_flight_by_dead_worker_is_taken_over(
+    user_client: TestClient, interviews, engine, llm
+) -> None:
+    headers = {**interviews.start(), "Idempotency-Key": "answer-1"}
+    session_id = int(headers["Session-ID"])
+    request_hash = hashlib.sha256(
+        f"{session_id}:{headers['X-Category-ID']}:Ducks".encode()
+    ).hexdigest()
+
+    # A worker reserved the key and claimed the question, then died
+    with Session(engine) as db:
+        user_id = db.exec(select(User.id).where(User.username == "ada")).one()
+        record = IdempotencyRecord(user_id=user_id, key="answer-1", request_hash=request_hash)
+        db.add(record)
+        db.commit()
+        version = db.get(InterviewSession, session_id).version
+        crud.claim_session_for_answer(db, session_id, version, lease_seconds=120)
+
+    # Within the lease the retry is told to wait
+    response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 409
+
+    with Session(engine) as db:
+        expired = datetime.utcnow() - timedelta(seconds=121)
+        record = db.exec(select(IdempotencyRecord)).one()
+        record.created_at = expired
+        interview_session = db.get(InterviewSession, session_id)
+        interview_session.answer_claimed_at = expired
+        db.add_all([record, interview_session])
+        db.commit()
+
+    # A different request cannot take over the key, even after the lease
+    reused = user_client.post("/session/answer", json={"answer_text": "Geese"}, headers=headers)
+    assert reused.status_code == 422
+
+    response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 200
+    replay = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert _answer_count(engine) == 1
+
+
+def test_key_released_while_checking_it_is_reserved_again(
+    user_client: TestClient, interviews, engine, monkeypatch
+) -> None:
+    headers = {**interviews.start(), "Idempotency-Key": "answer-1"}
+    reserve = crud.reserve_idempotency_key
+    attempts = []
+
+    def released_after_conflict(*args, **kwargs):
+        # The first reservation loses to an attempt that fails and deletes
+        # its record before this request looks it up
+        attempts.append(args)
+        return None if len(attempts) == 1 else reserve(*args, **kwargs)
+
+    monkeypatch.setattr(crud, "reserve_idempotency_key", released_after_conflict)
+    response = user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    assert response.status_code == 200
+    assert len(attempts) == 2
+    assert _answer_count(engine) == 1
+
+
+def test_replayed_completion_keeps_read_your_writes(user_client: TestClient, interviews) -> None:
+    headers = interviews.start(answers=[f"Answer {i}" for i in range(4)])
+    headers["Idempotency-Key"] = "last-answer"
+    first = user_client.post("/session/answer", json={"answer_text": "Done"}, headers=headers)
+    assert first.json() == {"message": "Session completed"}
+
+    user_client.cookies.delete(READ_PRIMARY_COOKIE)
+    retry = user_client.post("/session/answer", json={"answer_text": "Done"}, headers=headers)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert READ_PRIMARY_COOKIE in retry.cookies
+
+
+def test_expired_records_are_purged(user_client: TestClient, interviews, engine) -> None:
+    headers = {**interviews.start(), "Idempotency-Key": "answer-1"}
+    user_client.post("/session/answer", json={"answer_text": "Ducks"}, headers=headers)
+    headers["Idempotency-Key"] = "answer-2"
+    user_client.post("/session/answer", json={"answer_text": "Geese"}, headers=headers)
+
+    with Session(engine) as db:
+        old = db.exec(select(IdempotencyRecord).where(IdempotencyRecord.key == "answer-1")).one()
+        old.created_at = datetime.utcnow() - timedelta(days=2)
+        db.add(old)
+        db.commit()
+
+        assert crud.purge_idempotency_records(db, timedelta(days=1)) == 1
+        assert db.exec(select(IdempotencyRecord.key)).all() == ["answer-2"]
@@ -0,0 +1,41 @@
+from typing import Iterator
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware import RequestSizeLimitMiddleware
+
+
+def _client(max_body_bytes: int) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, max_body_bytes=max_body_bytes)
+
+    @app.post("/echo")
+    async def echo(request: Request) -> dict:
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_declared_oversized_body_is_rejected() -> None:
+    client = _client(max_body_bytes=100)
+    assert client.post("/echo", content=b"x" * 100).json() == {"size": 100}
+
+    response = client.post("/echo", content=b"x" * 101)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body exceeds 100 bytes."}
+
+
+def test_streamed_oversized_body_is_rejected() -> None:
+    client = _client(max_body_bytes=100)
+
+    def chunks(count: int) -> Iterator[bytes]:
+        for _ in range(count):
+            yield b"x" * 40
+
+    # A generator body is sent chunked, without a Content-Length header
+    assert client.post("/echo", content=chunks(2)).json() == {"size": 80}
+
+    response = client.post("/echo", content=chunks(3))
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body exceeds 100 bytes."}
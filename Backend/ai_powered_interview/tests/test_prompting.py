@@ -0,0 +1,66 @@
+import asyncio
+import logging
+
+from fastapi.testclient import TestClient
+
+import app.main  # noqa: F401  (configures the "app" loggers)
+from app.services import langchain
+from app.services.prompting import count_tokens, fit_to_budget
+from app.settings import MAX_REQUEST_BODY_BYTES
+
+
+def test_count_tokens_splits_words_and_punctuation() -> None:
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, world!") == 6
+    # Long words count as several ~4 character pieces
+    assert count_tokens("polymorphism") == 3
+
+
+def test_fit_to_budget_leaves_short_answers_untouched() -> None:
+    answer = "Polymorphism lets a subclass stand in for its parent class."
+    result = fit_to_budget(answer, budget=100)
+    assert result.text == answer
+    assert not result.truncated
+
+
+def test_fit_to_budget_keeps_head_and_tail_with_marker() -> None:
+    answer = "START " + "filler " * 5000 + "END"
+    result = fit_to_budget(answer, budget=200)
+    assert result.truncated
+    assert result.tokens <= 200
+    assert result.text.startswith("START")
+    assert result.text.endswith("END")
+    assert "tokens of the answer were omitted" in result.text
+
+
+def test_llm_call_logs_prompt_tokens(monkeypatch) -> None:
+    class FakeChat:
+        def predict(self, prompt: str) -> str:
+            return "What is a closure?"
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("app.services.langchain")
+    logger.addHandler(handler)
+    monkeypatch.setattr(langchain, "chat", FakeChat())
+    try:
+        asyncio.run(langchain._predict("question", "Ask about Python closures.", attempt=1))
+    finally:
+        logger.removeHandler(handler)
+
+    # Emitted at a level the app's logging configuration keeps
+    [record] = [r for r in records if r.getMessage().startswith("llm_call")]
+    assert logger.isEnabledFor(record.levelno)
+    assert "kind=question prompt_tokens=" in record.getMessage()
+    assert "attempt=1" in record.getMessage()
+
+
+def test_oversized_request_keeps_cors_headers(client: TestClient) -> None:
+    response = client.post(
+        "/session/answer",
+        content=b"x" * (MAX_REQUEST_BODY_BYTES + 1),
+        headers={"Origin": "http://localhost:3000", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.services import langchain
+
+
+def test_parse_question_list_accepts_fenced_json_and_numbered_lines() -> None:
+    fenced = '```json\n["What is a list?", "What is a dict?", "What is a list?"]\n```'
+    assert langchain._parse_question_list(fenced) == ["What is a list?", "What is a dict?"]
+
+    numbered = "1. What is a list?\n2) What is a dict?\n\n- What is a set?"
+    assert langchain._parse_question_list(numbered) == [
+        "What is a list?", "What is a dict?", "What is a set?"
+    ]
+
+
+def test_parse_question_list_ignores_preambles_and_fences() -> None:
+    numbered = "Here are 5 questions about Python:\n1. What is a list?\n2. What is a dict?"
+    assert langchain._parse_question_list(numbered) == ["What is a list?", "What is a dict?"]
+
+    fenced = 'Sure!\n```json\n["Q1?", "Q2?"]\n```'
+    assert langchain._parse_question_list(fenced) == ["Q1?", "Q2?"]
+
+    # A bracket inside the preamble is not mistaken for the array
+    bracketed = 'Questions [Python]:\n["What is a tuple?"]'
+    assert langchain._parse_question_list(bracketed) == ["What is a tuple?"]
+
+    assert langchain._parse_question_list("Sorry, I can't help with that.") == []
+
+
+def test_short_plan_is_topped_up_from_question_bank(monkeypatch) -> None:
+    calls = []
+
+    async def fake_call_llm(kind: str, prompt: str, **log_fields: object) -> str:
+        calls.append(kind)
+        return '["Q1?", "Q2?"]'
+
+    monkeypatch.setattr(langchain, "_call_llm", fake_call_llm)
+    plan = asyncio.run(langchain.generate_question_plan("Python", 5))
+
+    assert calls == ["question_plan"]
+    assert plan.questions[:2] == ["Q1?", "Q2?"]
+    assert len(set(plan.questions)) == 5
+    assert plan.fallback
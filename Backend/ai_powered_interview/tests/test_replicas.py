@@ -0,0 +1,86 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from starlette.requests import Request
+
+from app import database
+from app.database import READ_PRIMARY_COOKIE, ReplicaRouter, make_engine
+
+
+def _request(cookie: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture
+def replicas(tmp_path: Path):
+    first = make_engine(f"sqlite:///{tmp_path / 'replica1.db'}")
+    second = make_engine(f"sqlite:///{tmp_path / 'replica2.db'}")
+    return first, second
+
+
+def test_round_robin_over_healthy_replicas(replicas) -> None:
+    router = ReplicaRouter(list(replicas), health_check_interval=60)
+    assert [router.pick() for _ in range(4)] == [*replicas, *replicas]
+
+
+def test_unhealthy_replica_is_skipped(replicas, tmp_path: Path) -> None:
+    broken = make_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter([broken, replicas[0]], health_check_interval=60)
+    assert [router.pick() for _ in range(3)] == [replicas[0]] * 3
+
+    router.mark_unhealthy(replicas[0])
+    assert router.pick() is None
+
+
+def test_read_session_routing(replicas, monkeypatch) -> None:
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([replicas[0]], 60))
+
+    session = next(database.get_read_session(_request()))
+    assert session.get_bind() is replicas[0]
+
+    # Read-your-writes: a client that just wrote is pinned to the primary
+    cookie = f"{READ_PRIMARY_COOKIE}={int(time.time()) + 30}"
+    session = next(database.get_read_session(_request(cookie)))
+    assert session.get_bind() is database.engine
+
+    # No healthy replica: fall back to the primary
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter([], 60))
+    session = next(database.get_read_session(_request()))
+    assert session.get_bind() is database.engine
+
+
+class _HangingEngine:
+    """
+    Stands in for a replica whose connect() hangs until released.
+    """
+
+    def __init__(self) -> None:
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def connect(self):
+        self.entered.set()
+        self.release.wait(5)
+        raise OSError("connection timed out")
+
+
+def test_slow_health_check_does_not_block_other_requests(replicas) -> None:
+    hanging = _HangingEngine()
+    router = ReplicaRouter([hanging, replicas[0]], health_check_interval=60)
+
+    probing = threading.Thread(target=router.pick)
+    probing.start()
+    assert hanging.entered.wait(5)
+
+    # While one request waits on the hanging replica, others are served
+    started = time.monotonic()
+    assert router.pick() is replicas[0]
+    assert router.pick() is replicas[0]
+    assert time.monotonic() - started < 1
+
+    hanging.release.set()
+    probing.join()
+    assert router.pick() is replicas[0]
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.services import langchain
+from app.services.resilience import CircuitBreaker, LatencyTracker, hedged
+
+
+def test_hedged_request_wins_when_first_call_stalls() -> None:
+    calls = []
+
+    async def call() -> str:
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+            return "slow"
+        return "fast"
+
+    result = asyncio.run(asyncio.wait_for(hedged(call, hedge_delay=0.01), timeout=1))
+    assert result == "fast"
+    assert len(calls) == 2
+
+
+def test_hedge_not_sent_for_fast_calls() -> None:
+    calls = []
+
+    async def call() -> str:
+        calls.append(1)
+        return "ok"
+
+    assert asyncio.run(hedged(call, hedge_delay=1)) == "ok"
+    assert len(calls) == 1
+
+
+def test_latency_tracker_uses_p95_once_warm() -> None:
+    tracker = LatencyTracker(min_samples=20, default_delay=3.0, min_delay=0.0)
+    assert tracker.hedge_delay() == 3.0
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.hedge_delay() == 0.95
+
+
+def test_circuit_breaker_opens_and_allows_single_trial() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()  # reset timeout elapsed: one trial call
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_call_does_not_wedge_the_breaker(monkeypatch) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setattr(langchain, "breaker", breaker)
+    calls = []
+
+    async def stalled(kind: str, prompt: str, **log_fields: object) -> str:
+        calls.append(kind)
+        await asyncio.sleep(5)
+        return "late"
+
+    monkeypatch.setattr(langchain, "_predict", stalled)
+
+    async def cancel_trial() -> None:
+        task = asyncio.ensure_future(langchain._call_llm("question", "prompt"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_trial())
+    # Not retried, and the next caller gets to make the trial call
+    assert calls == ["question"]
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from sqlalchemy import inspect, text
+
+from app import database, migrations
+from app.main import app
+
+# Tables as the first release created them, before any column was added
+BASELINE_DDL = [
+    """CREATE TABLE user (
+        id INTEGER NOT NULL PRIMARY KEY,
+        username VARCHAR NOT NULL UNIQUE,
+        email VARCHAR NOT NULL UNIQUE,
+        hashed_password VARCHAR NOT NULL,
+        created_at DATETIME NOT NULL,
+        role VARCHAR NOT NULL
+    )""",
+    """CREATE TABLE category (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR NOT NULL UNIQUE
+    )""",
+    """CREATE TABLE session (
+        id INTEGER NOT NULL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES user (id),
+        category_id INTEGER NOT NULL REFERENCES category (id),
+        current_question VARCHAR,
+        completed BOOLEAN NOT NULL,
+        started_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE answer (
+        id INTEGER NOT NULL PRIMARY KEY,
+        session_id INTEGER NOT NULL REFERENCES session (id),
+        question VARCHAR NOT NULL,
+        answer_text VARCHAR NOT NULL,
+        feedback VARCHAR NOT NULL,
+        submitted_at DATETIME NOT NULL
+    )""",
+]
+
+
+@pytest.fixture
+def baseline_engine(tmp_path: Path, monkeypatch):
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_DDL:
+            connection.execute(text(statement))
+    # The lifespan and the default session dependencies use this engine
+    monkeypatch.setattr(database, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+def test_app_runs_on_database_with_baseline_schema(baseline_engine, llm) -> None:
+    # A session that was in progress when the new release was deployed
+    with baseline_engine.begin() as connection:
+        connection.execute(text("INSERT INTO category (id, name) VALUES (1, 'Python')"))
+        connection.execute(text(
+            "INSERT INTO user (id, username, email, hashed_password, created_at, role) "
+            "VALUES (1, 'grace', 'grace@example.com', :password, '2024-10-01 00:00:00', 'user')"
+        ), {"password": bcrypt.hash("secret")})
+        connection.execute(text(
+            "INSERT INTO session (id, user_id, category_id, current_question, completed, started_at) "
+            "VALUES (1, 1, 1, 'What is a list?', 0, '2024-10-01 00:00:00')"
+        ))
+
+    with TestClient(app) as client:
+        columns = {c["name"] for c in inspect(baseline_engine).get_columns("session")}
+        assert {"question_plan", "version", "answer_claimed_at"} <= columns
+
+        client.post(
+            "/users/register",
+            json={"username": "ada", "email": "ada@example.com", "password": "secret"},
+        )
+        client.post("/users/login", data={"username": "ada", "password": "secret"})
+        headers = {"X-Category-ID": "1"}
+        session_id = client.post("/session/init", json={}, headers=headers).json()["id"]
+        headers["Session-ID"] = str(session_id)
+        for i in range(5):
+            response = client.post("/session/answer", json={"answer_text": f"Answer {i}"}, headers=headers)
+            assert response.status_code == 200
+        assert len(client.get("/session/final", headers=headers).json()) == 5
+
+        # Existing rows get the column defaults; without a plan the next
+        # question is generated on the spot, as before
+        client.post("/users/login", data={"username": "grace", "password": "secret"})
+        response = client.post(
+            "/session/answer",
+            json={"answer_text": "An ordered, mutable sequence."},
+            headers={"X-Category-ID": "1", "Session-ID": "1"},
+        )
+        assert response.status_code == 200
+        assert llm[-2:] == ["feedback", "question"]
+
+    # Running the upgrade again is a no-op
+    database.add_missing_columns(baseline_engine)
+
+
+def test_migration_adds_indexes_missing_from_existing_tables(baseline_engine) -> None:
+    database.create_db_and_tables()
+    assert "ix_answer_session_id" not in {i["name"] for i in inspect(baseline_engine).get_indexes("answer")}
+
+    migrations.create_indexes(baseline_engine)
+    migrations.create_indexes(baseline_engine)
+    assert "ix_answer_session_id" in {i["name"] for i in inspect(baseline_engine).get_indexes("answer")}
@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete
+
+from app import models
+
+
+def test_search_ranks_and_paginates_own_answers(
+    user_client: TestClient, interviews, queries, query_budget
+) -> None:
+    interviews.start("Algorithms", [
+        "Use a hash map; the time complexity is linear.",
+        "Sorting first gives n log n time complexity, and complexity matters.",
+        "I would ask clarifying questions.",
+    ])
+
+    with queries.count():
+        response = user_client.get("/search/", params={"q": "complexity"})
+    assert response.status_code == 200
+    query_budget("GET /search/")
+    results = response.json()["results"]
+    assert len(results) == 2
+    # The answer mentioning the term most often ranks first
+    assert results[0]["answer_text"].startswith("Sorting first")
+    assert results[0]["score"] >= results[1]["score"]
+
+    # Stemming: "sorted" matches "Sorting"
+    assert len(user_client.get("/search/", params={"q": "sorted"}).json()["results"]) == 1
+
+    page = user_client.get("/search/", params={"q": "complexity", "limit": 1, "offset": 1}).json()
+    assert [hit["answer_id"] for hit in page["results"]] == [results[1]["answer_id"]]
+
+    # FTS syntax in user input is treated as plain words
+    assert user_client.get("/search/", params={"q": 'complexity" OR *'}).status_code == 200
+
+
+def test_search_is_scoped_to_current_user_and_tracks_deletes(
+    user_client: TestClient, interviews, engine
+) -> None:
+    interviews.start("Algorithms", ["Binary search halves the range each step."])
+
+    user_client.cookies.clear()
+    user_client.post(
+        "/users/register",
+        json={"username": "grace", "email": "grace@example.com", "password": "secret"},
+    )
+    user_client.post("/users/login", data={"username": "grace", "password": "secret"})
+    assert user_client.get("/search/", params={"q": "binary"}).json()["results"] == []
+    assert user_client.get("/search/", params={"q": "binary", "all_users": True}).status_code == 403
+
+    with Session(engine) as db:
+        db.exec(delete(models.Answer))
+        db.commit()
+    user_client.post("/users/login", data={"username": "ada", "password": "secret"})
+    assert user_client.get("/search/", params={"q": "binary"}).json()["results"] == []
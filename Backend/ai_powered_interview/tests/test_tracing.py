@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import tracing
+
+
+class InMemorySpanExporter:
+    def __init__(self) -> None:
+        self.traces: List[List[tracing.Span]] = []
+
+    def export(self, spans: List[tracing.Span]) -> None:
+        self.traces.append(spans)
+
+
+@pytest.fixture
+def spans(monkeypatch) -> InMemorySpanExporter:
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracing.tracer, "exporter", exporter)
+    monkeypatch.setattr(tracing.tracer, "sample_rate", 1.0)
+    return exporter
+
+
+def test_request_trace_links_crud_sql_and_serialization(user_client: TestClient, spans) -> None:
+    spans.traces.clear()
+    assert user_client.post("/categories/", json={"name": "Python"}).status_code == 200
+
+    [trace] = spans.traces
+    by_id = {span.span_id: span for span in trace}
+    [root] = [span for span in trace if span.parent_span_id is None]
+    assert root.name == "POST /categories/"
+    assert root.attributes["http.status_code"] == 200
+    assert all(span.trace.trace_id == root.trace.trace_id for span in trace)
+    assert all(span.parent_span_id in by_id for span in trace if span is not root)
+
+    names = [span.name for span in trace]
+    assert "crud.create_category" in names
+    assert "serialize" in names
+    # SQL issued by crud functions nests under the crud span
+    create = next(span for span in trace if span.name == "crud.create_category")
+    assert any(span.name == "sql" and span.parent_span_id == create.span_id for span in trace)
+
+    payload = tracing.otlp_payload(trace)
+    exported = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(exported) == len(trace)
+    json.dumps(payload)
+
+
+def test_unsampled_requests_are_not_exported(user_client: TestClient, spans, monkeypatch) -> None:
+    monkeypatch.setattr(tracing.tracer, "sample_rate", 0.0)
+    spans.traces.clear()
+    user_client.get("/categories/")
+    assert spans.traces == []
+
+
+def test_untraced_work_shares_the_noop_span(engine, spans, monkeypatch) -> None:
+    from sqlalchemy import text
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("ids generated for an unrecorded span")
+
+    monkeypatch.setattr(tracing.os, "urandom", unexpected)
+
+    # SQL and crud calls outside any trace (e.g. batch jobs) start no trace
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert tracing.tracer.begin("sql", root=False) is tracing.NOOP_SPAN
+
+    # Nor does anything under an unsampled root
+    monkeypatch.setattr(tracing.tracer, "sample_rate", 0.0)
+    with tracing.tracer.span("GET /") as root:
+        assert root is tracing.NOOP_SPAN
+        root.set_error("ValueError")
+        assert tracing.tracer.begin("crud.get_categories", root=False) is tracing.NOOP_SPAN
+    assert spans.traces == []
+    assert tracing.NOOP_SPAN.attributes == {} and tracing.NOOP_SPAN.status == tracing.STATUS_OK
+
+
+def test_executor_call_keeps_parent_and_records_queue_time(spans) -> None:
+    worker_spans = []
+
+    def blocking() -> str:
+        worker_spans.append(tracing.tracer.current_span())
+        return threading.current_thread().name
+
+    async def traced_call() -> str:
+        with tracing.tracer.span("handler"):
+            return await tracing.run_in_executor_traced("llm.question", blocking, prompt_tokens=12)
+
+    assert asyncio.run(traced_call()) != threading.current_thread().name
+
+    [trace] = spans.traces
+    handler, llm, queued = (next(s for s in trace if s.name == name) for name in (
+        "handler", "llm.question", "llm.question.queued"
+    ))
+    assert llm.parent_span_id == handler.span_id
+    assert queued.parent_span_id == llm.span_id
+    assert worker_spans == [llm]
+    assert llm.attributes["prompt_tokens"] == 12
+    assert llm.start_ns <= queued.start_ns <= queued.end_ns <= llm.end_ns
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path, spans) -> None:
+    exporter = tracing.FileSpanExporter(str(tmp_path / "traces.jsonl"))
+    with tracing.tracer.span("root", answers=3):
+        pass
+    # Written by the exporter's background thread
+    exporter.export(spans.traces[0])
+    exporter.flush()
+
+    [line] = (tmp_path / "traces.jsonl").read_text().splitlines()
+    [span] = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert span["name"] == "root"
+    assert span["attributes"] == [{"key": "answers", "value": {"intValue": "3"}}]
+    assert "parentSpanId" not in span
+
+
+def test_export_failures_are_logged_with_rate_limit(spans) -> None:
+    with pytest.raises(TypeError):
+        tracing._BackgroundExporter()  # subclasses must implement _write
+
+    class UnreachableCollector(tracing._BackgroundExporter):
+        def _write(self, payload: Dict[str, Any]) -> None:
+            raise OSError("connection refused")
+
+    exporter = UnreachableCollector()
+    with tracing.tracer.span("root"):
+        pass
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    tracing.logger.addHandler(handler)
+    try:
+        for _ in range(3):
+            exporter.export(spans.traces[0])
+        exporter.flush()
+    finally:
+        tracing.logger.removeHandler(handler)
+
+    [record] = records
+    assert record.levelno == logging.WARNING
+    assert "UnreachableCollector" in record.getMessage()
+    assert "connection refused" in record.getMessage()